@@ -0,0 +1,92 @@
+"""Compare stateless extract_diff_bboxes against a reused DiffDetector.
+
+Usage: python benchmarks/bench_diff_detector.py --width 1920 --height 1080 --frames 300
+"""
+from __future__ import annotations
+
+import argparse
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from rtb_perception.diff_bbox import DiffDetector, extract_diff_bboxes
+
+
+def make_frames(width: int, height: int, count: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    frames = []
+    for i in range(count):
+        frame = base.copy()
+        x = (i * 7) % max(1, width - 80)
+        y = height // 3 + (i * 3) % max(1, height // 3)
+        frame[y : y + 60, x : x + 60] = 255
+        frames.append(frame)
+    return frames
+
+
+def max_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def bench(label: str, detect, frames, blur: int) -> None:
+    rss_before = max_rss_mb()
+    detect(frames[0], frames[1])
+    tracemalloc.start()
+    start = time.perf_counter()
+    for prev_frame, curr_frame in zip(frames, frames[1:]):
+        detect(prev_frame, curr_frame)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = max_rss_mb()
+    fps = (len(frames) - 1) / elapsed
+    print(
+        f"{label:<12} blur={blur} {fps:8.1f} fps  peak_alloc={peak / 1e6:7.2f} MB  "
+        f"maxrss={rss_after:7.1f} MB  rss_delta={rss_after - rss_before:6.1f} MB"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--blur", type=int, default=5)
+    parser.add_argument(
+        "--path",
+        choices=["detector", "stateless"],
+        default=None,
+        help="Run one path in this process (default: each path in its own subprocess)",
+    )
+    args = parser.parse_args()
+
+    if args.path is None:
+        # separate processes so each path's max RSS is its own
+        for path in ("detector", "stateless"):
+            cmd = [sys.executable, __file__, "--path", path]
+            cmd += ["--width", str(args.width), "--height", str(args.height)]
+            cmd += ["--frames", str(args.frames), "--blur", str(args.blur)]
+            subprocess.run(cmd, check=True)
+        return 0
+
+    frames = make_frames(args.width, args.height, args.frames)
+    if args.path == "detector":
+        detector = DiffDetector(blur_ksize=args.blur)
+        bench("detector", detector.detect, frames, args.blur)
+    else:
+        bench(
+            "stateless",
+            lambda a, b: extract_diff_bboxes(a, b, blur_ksize=args.blur),
+            frames,
+            args.blur,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,77 @@
+"""Compare cold run_tracker invocations against jobs on a warm daemon.
+
+Usage: python benchmarks/bench_startup.py --runs 10
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from rtb_perception.daemon import submit
+
+
+def write_clip(path: Path, frames: int = 30) -> None:
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 30, (320, 240))
+    for i in range(frames):
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        frame[100:140, 10 + i * 5 : 50 + i * 5] = 255
+        writer.write(frame)
+    writer.release()
+
+
+def timed(fn, runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def report(label: str, samples: list) -> None:
+    median_ms = statistics.median(samples) * 1000
+    print(f"{label:<24} median={median_ms:8.1f} ms  min={min(samples) * 1000:8.1f} ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        clip = tmp_path / "clip.avi"
+        write_clip(clip)
+        job = ["--video", str(clip), "--out", str(tmp_path / "out")]
+
+        import_cmd = [sys.executable, "-c", "import rtb_perception.run_tracker"]
+        cold_cmd = [sys.executable, "-m", "rtb_perception.run_tracker", *job]
+        report("import run_tracker", timed(lambda: subprocess.run(import_cmd, check=True), args.runs))
+        report("cold run_tracker", timed(lambda: subprocess.run(cold_cmd, check=True), args.runs))
+
+        sock = str(tmp_path / "daemon.sock")
+        serve_cmd = [sys.executable, "-m", "rtb_perception.daemon", "serve"]
+        serve_cmd += ["--socket", sock, "--workers", "1"]
+        daemon = subprocess.Popen(serve_cmd, stdout=subprocess.PIPE)
+        try:
+            daemon.stdout.readline()
+            report("warm daemon (in-proc)", timed(lambda: submit(job, sock), args.runs))
+            client_cmd = [sys.executable, "-m", "rtb_perception.daemon", "submit"]
+            client_cmd += ["--socket", sock, "--", *job]
+            report("warm daemon (client CLI)", timed(lambda: subprocess.run(client_cmd, check=True), args.runs))
+        finally:
+            daemon.terminate()
+            daemon.wait()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
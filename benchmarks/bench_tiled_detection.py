@@ -0,0 +1,67 @@
+"""Benchmark tile-parallel DiffDetector across tile counts and resolutions.
+
+Usage: python benchmarks/bench_tiled_detection.py --tiles 1 2 4 8 --frames 60
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from rtb_perception.diff_bbox import DiffDetector
+
+RESOLUTIONS = {
+    "1080p": (1920, 1080),
+    "1440p": (2560, 1440),
+    "4k": (3840, 2160),
+}
+
+
+def make_frames(width: int, height: int, count: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    frames = []
+    for i in range(count):
+        frame = base.copy()
+        for j in range(8):
+            x = (i * 9 + j * width // 8) % max(1, width - 120)
+            y = height // 5 + (j * height // 12 + i * 4) % max(1, height // 2)
+            frame[y : y + 100, x : x + 100] = 255
+        frames.append(frame)
+    return frames
+
+
+def bench(frames, tiles: int, blur: int, kernel_size: int) -> float:
+    detector = DiffDetector(blur_ksize=blur, kernel_size=kernel_size, tiles=tiles)
+    detector.detect(frames[0], frames[1])
+    start = time.perf_counter()
+    for prev_frame, curr_frame in zip(frames, frames[1:]):
+        detector.detect(prev_frame, curr_frame)
+    elapsed = time.perf_counter() - start
+    detector.close()
+    return (len(frames) - 1) / elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resolutions", nargs="+", default=list(RESOLUTIONS))
+    parser.add_argument("--tiles", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--blur", type=int, default=5)
+    parser.add_argument("--kernel-size", type=int, default=3)
+    args = parser.parse_args()
+
+    for name in args.resolutions:
+        width, height = RESOLUTIONS[name]
+        frames = make_frames(width, height, args.frames)
+        baseline = None
+        for tiles in args.tiles:
+            fps = bench(frames, tiles, args.blur, args.kernel_size)
+            baseline = baseline or fps
+            print(f"{name:<6} tiles={tiles:<3} {fps:8.1f} fps  speedup={fps / baseline:5.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
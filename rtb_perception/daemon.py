@@ -0,0 +1,230 @@
+"""Warm worker daemon for run_tracker jobs.
+
+The server keeps NumPy/OpenCV and the tracker loaded in a pool of worker
+processes and accepts jobs over a local Unix socket, so short clips do not pay
+interpreter and import startup per run. The client side only uses the
+standard library and never imports the heavy modules.
+
+    python -m rtb_perception.daemon serve --socket /tmp/rtb.sock --workers 4
+    python -m rtb_perception.daemon submit --socket /tmp/rtb.sock -- --video clip.mp4 --out out
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, List, Optional
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+DEFAULT_SOCKET = "/tmp/rtb_perception.sock"
+
+
+def _warm_worker() -> None:
+    from . import run_tracker  # noqa: F401  imports numpy/cv2 once per worker
+
+
+def _warm_noop() -> int:
+    return os.getpid()
+
+
+def _run_job(argv: List[str], cwd: str) -> dict:
+    from .run_tracker import run
+
+    start = time.perf_counter()
+    os.chdir(cwd)
+    try:
+        returncode = run(argv)
+        error = None
+    except SystemExit as exc:
+        # argparse reports bad options via SystemExit
+        returncode = exc.code if isinstance(exc.code, int) else 1
+        error = None if returncode == 0 else "invalid arguments"
+    except Exception as exc:
+        returncode = 1
+        error = f"{type(exc).__name__}: {exc}"
+    return {
+        "returncode": returncode,
+        "error": error,
+        "elapsed": time.perf_counter() - start,
+        "pid": os.getpid(),
+    }
+
+
+def _send_json(handle, data: dict) -> None:
+    handle.write((json.dumps(data) + "\n").encode("utf-8"))
+    handle.flush()
+
+
+class _JobHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+            argv = [str(arg) for arg in request["argv"]]
+            cwd = str(request.get("cwd") or os.getcwd())
+        except (ValueError, KeyError, TypeError) as exc:
+            _send_json(self.wfile, {"returncode": 2, "error": f"bad request: {exc}"})
+            return
+        _send_json(self.wfile, self.server.run_job(argv, cwd))
+
+
+class JobServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, make_pool: Callable[[], Executor]) -> None:
+        self._make_pool = make_pool
+        self._pool_lock = threading.Lock()
+        self.pool = make_pool()
+        super().__init__(socket_path, _JobHandler)
+
+    def replace_pool(self, broken: Executor) -> None:
+        # a worker killed mid-job (OOM, segfault) breaks the whole executor
+        with self._pool_lock:
+            if self.pool is broken:
+                broken.shutdown(wait=False)
+                self.pool = self._make_pool()
+
+    def run_job(self, argv: List[str], cwd: str) -> dict:
+        from concurrent.futures.process import BrokenProcessPool
+
+        for _ in range(2):
+            pool = self.pool
+            try:
+                future = pool.submit(_run_job, argv, cwd)
+            except BrokenProcessPool:
+                # the job never started; resubmit it on a fresh pool
+                self.replace_pool(pool)
+                continue
+            try:
+                return future.result()
+            except BrokenProcessPool:
+                self.replace_pool(pool)
+                return {"returncode": 1, "error": "worker process died; pool restarted"}
+            except Exception as exc:
+                return {"returncode": 1, "error": f"{type(exc).__name__}: {exc}"}
+        return {"returncode": 1, "error": "worker pool unavailable"}
+
+
+def _socket_in_use(path: Path) -> bool:
+    """True unless ``path`` is absent or a Unix socket nobody is listening on."""
+    try:
+        mode = path.lstat().st_mode
+    except FileNotFoundError:
+        return False
+    if not stat.S_ISSOCK(mode):
+        return True
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(str(path))
+        except ConnectionRefusedError:
+            return False
+    return True
+
+
+def serve(socket_path: str = DEFAULT_SOCKET, workers: int = 0) -> int:
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    path = Path(socket_path)
+    if _socket_in_use(path):
+        print(
+            f"{socket_path} exists and is not a stale socket; refusing to replace it",
+            file=sys.stderr,
+        )
+        return 1
+    if path.exists():
+        # stale socket left by a daemon that did not shut down cleanly
+        path.unlink()
+
+    workers = workers or os.cpu_count() or 1
+    # spawn avoids forking the threaded server; each worker imports once
+    context = multiprocessing.get_context("spawn")
+
+    def make_pool() -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_warm_worker,
+        )
+
+    server = JobServer(socket_path, make_pool)
+    pool = server.pool
+    pids = {f.result() for f in [pool.submit(_warm_noop) for _ in range(workers * 2)]}
+
+    def _terminate(signum, frame) -> None:
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, _terminate)
+    print(f"rtb_perception daemon on {socket_path} with {len(pids)} warm workers", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.pool.shutdown(wait=True)
+        if path.exists():
+            path.unlink()
+    return 0
+
+
+def submit(
+    argv: List[str],
+    socket_path: str = DEFAULT_SOCKET,
+    timeout: Optional[float] = None,
+) -> dict:
+    request = {"argv": list(argv), "cwd": os.getcwd()}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        with sock.makefile("rb") as handle:
+            line = handle.readline()
+    if not line:
+        raise ConnectionError("daemon closed the connection without a result")
+    return json.loads(line)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Warm run_tracker worker daemon")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve_parser = sub.add_parser("serve", help="Run the daemon")
+    serve_parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket path")
+    serve_parser.add_argument(
+        "--workers", type=int, default=0, help="Worker processes (0 uses CPU count)"
+    )
+    submit_parser = sub.add_parser("submit", help="Submit one run_tracker job")
+    submit_parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket path")
+    submit_parser.add_argument(
+        "job_args", nargs=argparse.REMAINDER, help="run_tracker arguments (after --)"
+    )
+    return parser.parse_args(argv)
+
+
+def run(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.command == "serve":
+        return serve(args.socket, args.workers)
+    job_args = args.job_args
+    if job_args and job_args[0] == "--":
+        job_args = job_args[1:]
+    result = submit(job_args, args.socket)
+    if result.get("error"):
+        print(f"job failed: {result['error']}", file=sys.stderr)
+    return int(result.get("returncode", 1))
+
+
+if __name__ == "__main__":
+    raise SystemExit(run())
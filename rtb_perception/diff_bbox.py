@@ -1,10 +1,13 @@
 from __future__ import annotations
 
-from typing import List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 import cv2
 import numpy as np
 
+from .diff_mask import DiffMask
+
 Bbox = Tuple[int, int, int, int]
 
 
@@ -42,6 +45,253 @@ def normalize_blur_ksize(blur_ksize: int) -> int:
     return blur_ksize
 
 
+class DiffDetector:
+    """Stateful diff detector reusing ROI bounds, kernel and working buffers.
+
+    Buffers are sized on the first frame and reallocated only when the frame
+    resolution changes, so the steady-state per-frame path passes ``dst=``
+    outputs through every OpenCV call instead of allocating new arrays.
+
+    With ``storm_ratio`` > 0, frames whose changed-pixel fraction reaches it
+    are classified as ``flash`` (global luma shift of at least
+    ``flash_luma_delta``) or ``cut`` and return no boxes; ``frame_class``
+    holds the classification of the last frame.
+
+    With ``tiles`` > 1, the ROI is split into horizontal strips processed on a
+    thread pool (OpenCV releases the GIL). Each strip is extended by the
+    blur and morphology radius so its owned rows are exact, the owned rows are
+    stitched into one mask, and contours are found once on the stitched mask,
+    so the boxes match the untiled result.
+    """
+
+    def __init__(
+        self,
+        threshold: int = 25,
+        min_area: int = 100,
+        kernel_size: int = 3,
+        blur_ksize: int = 0,
+        roi_top: float = 0.14,
+        roi_bottom: float = 0.74,
+        roi_left: float = 0.0,
+        roi_right: float = 1.0,
+        diff_mask: Optional[DiffMask] = None,
+        storm_ratio: float = 0.0,
+        flash_luma_delta: float = 20.0,
+        tiles: int = 1,
+    ) -> None:
+        self.threshold = threshold
+        self.min_area = min_area
+        self.kernel_size = kernel_size
+        self.blur_ksize = normalize_blur_ksize(blur_ksize)
+        self.roi_top = roi_top
+        self.roi_bottom = roi_bottom
+        self.roi_left = roi_left
+        self.roi_right = roi_right
+        self.diff_mask = diff_mask
+        self.storm_ratio = storm_ratio
+        self.flash_luma_delta = flash_luma_delta
+        self.frame_class = "normal"
+        self.changed_fraction = 0.0
+        self.tiles = max(1, tiles)
+        self.kernel: Optional[np.ndarray] = None
+        if kernel_size > 1:
+            self.kernel = np.ones((kernel_size, kernel_size), dtype=np.uint8)
+        self.roi: Optional[Bbox] = None
+        self.configured_roi: Optional[Bbox] = None
+        self._frame_shape: Optional[Tuple[int, int]] = None
+        self._buffers: Dict[str, np.ndarray] = {}
+        self._thresh_map: Optional[np.ndarray] = None
+        self._region_map: Optional[np.ndarray] = None
+        self._region_min_areas: List[int] = [min_area]
+        self._active_pixels = 0
+        self._tiles: List[Tuple[int, int, int, int, Dict[str, np.ndarray]]] = []
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def _prepare_mask(self, frame_shape: Tuple[int, ...]) -> None:
+        thresh_map, region_map = self.diff_mask.rasterize(frame_shape, self.roi, self.threshold)
+        # shrink the working ROI to the bounding rect of non-excluded pixels
+        keep = (thresh_map < 255).astype(np.uint8)
+        bx, by, bw, bh = cv2.boundingRect(keep)
+        x1, y1, _, _ = self.roi
+        self.roi = (x1 + bx, y1 + by, x1 + bx + bw, y1 + by + bh)
+        self._thresh_map = np.ascontiguousarray(thresh_map[by : by + bh, bx : bx + bw])
+        self._region_map = np.ascontiguousarray(region_map[by : by + bh, bx : bx + bw])
+        self._region_min_areas = [self.min_area] + [
+            self.min_area if r.min_area is None else r.min_area for r in self.diff_mask.regions
+        ]
+        self._active_pixels = cv2.countNonZero(keep)
+
+    def _prepare(self, frame_shape: Tuple[int, ...]) -> None:
+        if self._frame_shape == frame_shape[:2]:
+            return
+        self._frame_shape = frame_shape[:2]
+        self.roi = compute_roi_bounds(
+            frame_shape,
+            roi_top=self.roi_top,
+            roi_bottom=self.roi_bottom,
+            roi_left=self.roi_left,
+            roi_right=self.roi_right,
+        )
+        # the mask may shrink self.roi; keep the configured one for drawing
+        self.configured_roi = self.roi
+        self._buffers = {}
+        x1, y1, x2, y2 = self.roi
+        if x2 <= x1 or y2 <= y1:
+            return
+        if self.diff_mask is not None:
+            self._prepare_mask(frame_shape)
+            x1, y1, x2, y2 = self.roi
+            if x2 <= x1 or y2 <= y1:
+                return
+        shape = (y2 - y1, x2 - x1)
+        if self.diff_mask is None:
+            self._active_pixels = shape[0] * shape[1]
+        self._tiles = []
+        if self.tiles > 1 and shape[0] > 1:
+            self._prepare_tiles(shape)
+            self._buffers["mask"] = np.empty(shape, dtype=np.uint8)
+        else:
+            self._buffers = self._allocate_buffers(shape)
+
+    def _allocate_buffers(self, shape: Tuple[int, int]) -> Dict[str, np.ndarray]:
+        names = ["prev_gray", "curr_gray", "diff", "mask", "morph"]
+        if self.blur_ksize > 0:
+            names += ["prev_blur", "curr_blur"]
+        return {name: np.empty(shape, dtype=np.uint8) for name in names}
+
+    def _halo(self) -> int:
+        # rows of context an owned row depends on: blur, then open + close
+        morph_radius = self.kernel_size // 2 if self.kernel is not None else 0
+        return self.blur_ksize // 2 + 4 * morph_radius
+
+    def _prepare_tiles(self, shape: Tuple[int, int]) -> None:
+        height, width = shape
+        count = min(self.tiles, height)
+        halo = self._halo()
+        bounds = [round(i * height / count) for i in range(count + 1)]
+        for own_y1, own_y2 in zip(bounds, bounds[1:]):
+            ext_y1 = max(0, own_y1 - halo)
+            ext_y2 = min(height, own_y2 + halo)
+            buffers = self._allocate_buffers((ext_y2 - ext_y1, width))
+            self._tiles.append((ext_y1, ext_y2, own_y1, own_y2, buffers))
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.tiles, thread_name_prefix="diff-tile")
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def _threshold(
+        self,
+        prev_crop: np.ndarray,
+        curr_crop: np.ndarray,
+        buf: Dict[str, np.ndarray],
+        thresh_map: Optional[np.ndarray],
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        prev_gray = cv2.cvtColor(prev_crop, cv2.COLOR_BGR2GRAY, dst=buf["prev_gray"])
+        curr_gray = cv2.cvtColor(curr_crop, cv2.COLOR_BGR2GRAY, dst=buf["curr_gray"])
+        if self.blur_ksize > 0:
+            ksize = (self.blur_ksize, self.blur_ksize)
+            prev_gray = cv2.GaussianBlur(prev_gray, ksize, 0, dst=buf["prev_blur"])
+            curr_gray = cv2.GaussianBlur(curr_gray, ksize, 0, dst=buf["curr_blur"])
+        diff = cv2.absdiff(prev_gray, curr_gray, dst=buf["diff"])
+        if thresh_map is not None:
+            mask = cv2.compare(diff, thresh_map, cv2.CMP_GT, dst=buf["mask"])
+        else:
+            _, mask = cv2.threshold(
+                diff, self.threshold, 255, cv2.THRESH_BINARY, dst=buf["mask"]
+            )
+        return prev_gray, curr_gray, mask
+
+    def _morph(self, mask: np.ndarray, buf: Dict[str, np.ndarray]) -> np.ndarray:
+        if self.kernel is None:
+            return mask
+        opened = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self.kernel, dst=buf["morph"])
+        return cv2.morphologyEx(opened, cv2.MORPH_CLOSE, self.kernel, dst=buf["mask"])
+
+    def _is_storm(self, changed: int) -> bool:
+        self.changed_fraction = changed / self._active_pixels if self._active_pixels else 0.0
+        return self.storm_ratio > 0 and self.changed_fraction >= self.storm_ratio
+
+    def _storm_class(self, luma_shift: float) -> str:
+        return "flash" if luma_shift >= self.flash_luma_delta else "cut"
+
+    def _detect_tile(
+        self,
+        tile: Tuple[int, int, int, int, Dict[str, np.ndarray]],
+        prev_crop: np.ndarray,
+        curr_crop: np.ndarray,
+    ) -> int:
+        ext_y1, ext_y2, own_y1, own_y2, buf = tile
+        thresh_map = None if self._thresh_map is None else self._thresh_map[ext_y1:ext_y2]
+        _, _, mask = self._threshold(
+            prev_crop[ext_y1:ext_y2], curr_crop[ext_y1:ext_y2], buf, thresh_map
+        )
+        own = slice(own_y1 - ext_y1, own_y2 - ext_y1)
+        changed = cv2.countNonZero(mask[own])
+        mask = self._morph(mask, buf)
+        np.copyto(self._buffers["mask"][own_y1:own_y2], mask[own])
+        return changed
+
+    def _tiled_luma_shift(self) -> float:
+        gray = "_blur" if self.blur_ksize > 0 else "_gray"
+        prev_sum = curr_sum = 0.0
+        pixels = 0
+        for ext_y1, _, own_y1, own_y2, buf in self._tiles:
+            own = slice(own_y1 - ext_y1, own_y2 - ext_y1)
+            prev_sum += cv2.sumElems(buf["prev" + gray][own])[0]
+            curr_sum += cv2.sumElems(buf["curr" + gray][own])[0]
+            pixels += buf["prev" + gray][own].size
+        return abs(curr_sum - prev_sum) / pixels if pixels else 0.0
+
+    def detect(self, prev_frame: np.ndarray, curr_frame: np.ndarray) -> List[Bbox]:
+        self._prepare(prev_frame.shape)
+        self.frame_class = "normal"
+        self.changed_fraction = 0.0
+        if not self._buffers:
+            return []
+        roi_x1, roi_y1, roi_x2, roi_y2 = self.roi
+        prev_crop = prev_frame[roi_y1:roi_y2, roi_x1:roi_x2]
+        curr_crop = curr_frame[roi_y1:roi_y2, roi_x1:roi_x2]
+
+        if self._tiles:
+            changed = sum(
+                self._pool.map(
+                    lambda tile: self._detect_tile(tile, prev_crop, curr_crop), self._tiles
+                )
+            )
+            if self._is_storm(changed):
+                self.frame_class = self._storm_class(self._tiled_luma_shift())
+                return []
+            mask = self._buffers["mask"]
+        else:
+            buf = self._buffers
+            prev_gray, curr_gray, mask = self._threshold(
+                prev_crop, curr_crop, buf, self._thresh_map
+            )
+            if self._is_storm(cv2.countNonZero(mask)):
+                luma_shift = abs(cv2.mean(curr_gray)[0] - cv2.mean(prev_gray)[0])
+                self.frame_class = self._storm_class(luma_shift)
+                return []
+            mask = self._morph(mask, buf)
+
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        bboxes: List[Bbox] = []
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            if w * h < self._min_area_at(x + w // 2, y + h // 2):
+                continue
+            bbox = (int(x), int(y), int(x + w), int(y + h))
+            bboxes.append(apply_roi_offset(bbox, roi_x1, roi_y1))
+        return bboxes
+
+    def _min_area_at(self, x: int, y: int) -> int:
+        if self._region_map is None:
+            return self.min_area
+        return self._region_min_areas[int(self._region_map[y, x])]
+
+
 def extract_diff_bboxes(
     prev_frame: np.ndarray,
     curr_frame: np.ndarray,
@@ -53,39 +303,17 @@ def extract_diff_bboxes(
     roi_bottom: float = 0.74,
     roi_left: float = 0.0,
     roi_right: float = 1.0,
+    diff_mask: Optional[DiffMask] = None,
 ) -> List[Bbox]:
-    roi_x1, roi_y1, roi_x2, roi_y2 = compute_roi_bounds(
-        prev_frame.shape,
+    detector = DiffDetector(
+        threshold=threshold,
+        min_area=min_area,
+        kernel_size=kernel_size,
+        blur_ksize=blur_ksize,
         roi_top=roi_top,
         roi_bottom=roi_bottom,
         roi_left=roi_left,
         roi_right=roi_right,
+        diff_mask=diff_mask,
     )
-    if roi_x2 <= roi_x1 or roi_y2 <= roi_y1:
-        return []
-
-    prev_crop = prev_frame[roi_y1:roi_y2, roi_x1:roi_x2]
-    curr_crop = curr_frame[roi_y1:roi_y2, roi_x1:roi_x2]
-    prev_gray = cv2.cvtColor(prev_crop, cv2.COLOR_BGR2GRAY)
-    curr_gray = cv2.cvtColor(curr_crop, cv2.COLOR_BGR2GRAY)
-    blur_ksize = normalize_blur_ksize(blur_ksize)
-    if blur_ksize > 0:
-        prev_gray = cv2.GaussianBlur(prev_gray, (blur_ksize, blur_ksize), 0)
-        curr_gray = cv2.GaussianBlur(curr_gray, (blur_ksize, blur_ksize), 0)
-    diff = cv2.absdiff(prev_gray, curr_gray)
-    _, mask = cv2.threshold(diff, threshold, 255, cv2.THRESH_BINARY)
-
-    if kernel_size > 1:
-        kernel = np.ones((kernel_size, kernel_size), dtype=np.uint8)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
-
-    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    bboxes: List[Bbox] = []
-    for contour in contours:
-        x, y, w, h = cv2.boundingRect(contour)
-        if w * h < min_area:
-            continue
-        bbox = (int(x), int(y), int(x + w), int(y + h))
-        bboxes.append(apply_roi_offset(bbox, roi_x1, roi_y1))
-    return bboxes
+    return detector.detect(prev_frame, curr_frame)
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import argparse
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+Bbox = Tuple[int, int, int, int]
+Polygon = List[Tuple[float, float]]
+
+EXCLUDED_THRESHOLD = 255
+
+
+@dataclass
+class DiffRegion:
+    polygon: Polygon
+    threshold: Optional[int] = None
+    min_area: Optional[int] = None
+
+
+@dataclass
+class DiffMask:
+    """Static exclusion areas and per-region overrides for the diff stage.
+
+    Polygons use frame-relative ``[x, y]`` ratios like the ROI options.
+    ``exclude_image`` is a full-frame image where nonzero pixels are excluded;
+    it is resized to the video resolution with nearest-neighbour sampling.
+    """
+
+    exclude_image: Optional[np.ndarray] = None
+    exclude_polygons: List[Polygon] = field(default_factory=list)
+    regions: List[DiffRegion] = field(default_factory=list)
+
+    def rasterize(
+        self,
+        frame_shape: Tuple[int, ...],
+        roi: Bbox,
+        threshold: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ROI-sized threshold and region-id maps.
+
+        Excluded pixels get threshold 255, which no uint8 diff can exceed.
+        Region ids are 1-based indices into ``regions``; 0 means default.
+        """
+        height, width = frame_shape[:2]
+        x1, y1, x2, y2 = roi
+        thresh_map = np.full((height, width), min(threshold, 254), dtype=np.uint8)
+        region_map = np.zeros((height, width), dtype=np.uint8)
+
+        for region_id, region in enumerate(self.regions, start=1):
+            points = _polygon_to_pixels(region.polygon, width, height)
+            cv2.fillPoly(region_map, [points], region_id)
+            if region.threshold is not None:
+                region_thresh = max(0, min(int(region.threshold), 254))
+                cv2.fillPoly(thresh_map, [points], region_thresh)
+
+        if self.exclude_image is not None:
+            excluded = cv2.resize(
+                self.exclude_image, (width, height), interpolation=cv2.INTER_NEAREST
+            )
+            thresh_map[excluded > 0] = EXCLUDED_THRESHOLD
+        for polygon in self.exclude_polygons:
+            points = _polygon_to_pixels(polygon, width, height)
+            cv2.fillPoly(thresh_map, [points], EXCLUDED_THRESHOLD)
+
+        return (
+            np.ascontiguousarray(thresh_map[y1:y2, x1:x2]),
+            np.ascontiguousarray(region_map[y1:y2, x1:x2]),
+        )
+
+
+def _polygon_to_pixels(polygon: Polygon, width: int, height: int) -> np.ndarray:
+    return np.array(
+        [[int(round(x * width)), int(round(y * height))] for x, y in polygon],
+        dtype=np.int32,
+    )
+
+
+def _read_mask_image(path: Path) -> np.ndarray:
+    image = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        raise RuntimeError(f"Failed to read mask image: {path}")
+    return image
+
+
+def load_diff_mask(path: Union[str, Path]) -> DiffMask:
+    path = Path(path)
+    if path.suffix.lower() != ".json":
+        return DiffMask(exclude_image=_read_mask_image(path))
+
+    with path.open("r", encoding="utf-8") as handle:
+        data = json.load(handle)
+    exclude_image = None
+    if data.get("exclude_image"):
+        exclude_image = _read_mask_image(path.parent / data["exclude_image"])
+    regions = [
+        DiffRegion(
+            polygon=[tuple(p) for p in region["polygon"]],
+            threshold=region.get("threshold"),
+            min_area=region.get("min_area"),
+        )
+        for region in data.get("regions", [])
+    ]
+    return DiffMask(
+        exclude_image=exclude_image,
+        exclude_polygons=[[tuple(p) for p in poly] for poly in data.get("exclude", [])],
+        regions=regions,
+    )
+
+
+def learn_exclusion_mask(
+    video_path: Union[str, Path],
+    max_frames: int = 300,
+    start: int = 0,
+    threshold: int = 25,
+    min_change_ratio: float = 0.8,
+    window: int = 30,
+    dilate: int = 5,
+) -> np.ndarray:
+    """Accumulate recurring change over a clip and return an exclusion image.
+
+    Frame pairs are grouped into windows of ``window`` pairs (about one second
+    at 30 fps). A pixel is marked 255 when it changes at least once in
+    ``min_change_ratio`` of the windows: HUD timers that tick once a second,
+    the elixir bar and emotes recur in every window, while a unit passing a
+    pixel only touches one or two windows.
+    """
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise RuntimeError(f"Failed to open video: {video_path}")
+    if start > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    window = max(1, window)
+
+    counts: Optional[np.ndarray] = None
+    prev_gray: Optional[np.ndarray] = None
+    changed: Optional[np.ndarray] = None
+    window_changed: Optional[np.ndarray] = None
+    pairs = 0
+    windows = 0
+    while pairs < max_frames:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if prev_gray is not None:
+            if counts is None:
+                counts = np.zeros(gray.shape, dtype=np.uint32)
+                changed = np.empty(gray.shape, dtype=np.uint8)
+                window_changed = np.zeros(gray.shape, dtype=np.uint8)
+            diff = cv2.absdiff(prev_gray, gray)
+            cv2.threshold(diff, threshold, 1, cv2.THRESH_BINARY, dst=changed)
+            cv2.bitwise_or(window_changed, changed, dst=window_changed)
+            pairs += 1
+            if pairs % window == 0:
+                counts += window_changed
+                window_changed.fill(0)
+                windows += 1
+        prev_gray = gray
+    cap.release()
+
+    if counts is None:
+        raise RuntimeError(f"Not enough frames to learn mask: {video_path}")
+    if windows == 0:
+        # clip shorter than one window: treat it as a single window
+        counts += window_changed
+        windows = 1
+    mask = np.where(counts >= windows * min_change_ratio, 255, 0).astype(np.uint8)
+    if dilate > 1:
+        kernel = np.ones((dilate, dilate), dtype=np.uint8)
+        mask = cv2.dilate(mask, kernel)
+    return mask
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Learn a static diff exclusion mask")
+    parser.add_argument("--video", required=True, help="Path to input video")
+    parser.add_argument("--out", required=True, help="Output mask image (e.g. mask.png)")
+    parser.add_argument("--start", type=int, default=0, help="Start frame index")
+    parser.add_argument("--frames", type=int, default=300, help="Frame pairs to sample")
+    parser.add_argument("--diff-threshold", type=int, default=25, help="Diff threshold")
+    parser.add_argument(
+        "--min-change-ratio",
+        type=float,
+        default=0.8,
+        help="Fraction of windows a pixel must change in to be excluded",
+    )
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=30,
+        help="Frame pairs per window (about one second of video)",
+    )
+    parser.add_argument("--dilate", type=int, default=5, help="Dilation kernel size")
+    return parser.parse_args()
+
+
+def run() -> int:
+    args = parse_args()
+    mask = learn_exclusion_mask(
+        args.video,
+        max_frames=args.frames,
+        start=args.start,
+        threshold=args.diff_threshold,
+        min_change_ratio=args.min_change_ratio,
+        window=args.window,
+        dilate=args.dilate,
+    )
+    if not cv2.imwrite(args.out, mask):
+        raise RuntimeError(f"Failed to write mask: {args.out}")
+    excluded = float(np.count_nonzero(mask)) / mask.size
+    print(f"{args.out}: {excluded:.1%} of pixels excluded")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(run())
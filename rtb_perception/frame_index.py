@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import argparse
+import bisect
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Union
+
+import cv2
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".frameindex.json"
+
+
+@dataclass
+class FrameIndex:
+    frame_count: int
+    fps: float
+    keyframes: List[int] = field(default_factory=list)
+    timestamps_ms: List[Optional[float]] = field(default_factory=list)
+    video_size: int = 0
+    video_mtime_ns: int = 0
+    _known_ts: Optional[List[float]] = field(default=None, init=False, repr=False, compare=False)
+    _known_frames: List[int] = field(default_factory=list, init=False, repr=False, compare=False)
+
+    def nearest_keyframe(self, frame_index: int) -> int:
+        if not self.keyframes:
+            return 0
+        pos = bisect.bisect_right(self.keyframes, frame_index) - 1
+        if pos < 0:
+            return 0
+        return self.keyframes[pos]
+
+    def frame_at_timestamp(self, ts_ms: float, tolerance_ms: float = 0.5) -> Optional[int]:
+        # timestamps are monotonic, so bisect the known ones instead of scanning
+        if self._known_ts is None:
+            known = [(ts, i) for i, ts in enumerate(self.timestamps_ms) if ts is not None]
+            self._known_ts = [ts for ts, _ in known]
+            self._known_frames = [i for _, i in known]
+        pos = bisect.bisect_left(self._known_ts, ts_ms - tolerance_ms)
+        if pos < len(self._known_ts) and self._known_ts[pos] <= ts_ms + tolerance_ms:
+            return self._known_frames[pos]
+        return None
+
+    def time_sec(self, frame_index: int) -> Optional[float]:
+        if 0 <= frame_index < len(self.timestamps_ms):
+            ts = self.timestamps_ms[frame_index]
+            if ts is not None:
+                return ts / 1000.0
+        if self.fps and self.fps > 0:
+            return frame_index / self.fps
+        return None
+
+
+def default_index_path(video_path: Union[str, Path]) -> Path:
+    video_path = Path(video_path)
+    return video_path.with_name(video_path.name + INDEX_SUFFIX)
+
+
+def _video_stat(video_path: Path):
+    stat = video_path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def build_frame_index(video_path: Union[str, Path]) -> FrameIndex:
+    video_path = Path(video_path)
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise RuntimeError(f"Failed to open video: {video_path}")
+
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    # raw stream mode exposes keyframe flags without decoding each frame
+    raw_mode = hasattr(cv2, "CAP_PROP_LRF_HAS_KEY_FRAME") and cap.set(cv2.CAP_PROP_FORMAT, -1)
+
+    keyframes: List[int] = []
+    timestamps_ms: List[Optional[float]] = []
+    frame_index = 0
+    while cap.grab():
+        if raw_mode and cap.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME):
+            keyframes.append(frame_index)
+        ts = cap.get(cv2.CAP_PROP_POS_MSEC)
+        timestamps_ms.append(float(ts) if ts >= 0 else None)
+        frame_index += 1
+    cap.release()
+
+    # without keyframe flags the only safe seek point is the stream start
+    if not keyframes or keyframes[0] != 0:
+        keyframes.insert(0, 0)
+
+    size, mtime_ns = _video_stat(video_path)
+    return FrameIndex(
+        frame_count=frame_index,
+        fps=float(fps) if fps else 0.0,
+        keyframes=keyframes,
+        timestamps_ms=timestamps_ms,
+        video_size=size,
+        video_mtime_ns=mtime_ns,
+    )
+
+
+def save_frame_index(index: FrameIndex, path: Union[str, Path]) -> None:
+    data = {
+        "version": INDEX_VERSION,
+        "frame_count": index.frame_count,
+        "fps": index.fps,
+        "keyframes": index.keyframes,
+        "timestamps_ms": index.timestamps_ms,
+        "video_size": index.video_size,
+        "video_mtime_ns": index.video_mtime_ns,
+    }
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        json.dump(data, handle)
+    tmp_path.replace(path)
+
+
+def load_frame_index(path: Union[str, Path]) -> Optional[FrameIndex]:
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with path.open("r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != INDEX_VERSION:
+        return None
+    return FrameIndex(
+        frame_count=int(data["frame_count"]),
+        fps=float(data["fps"]),
+        keyframes=[int(k) for k in data["keyframes"]],
+        timestamps_ms=list(data["timestamps_ms"]),
+        video_size=int(data["video_size"]),
+        video_mtime_ns=int(data["video_mtime_ns"]),
+    )
+
+
+def load_or_build_frame_index(
+    video_path: Union[str, Path],
+    index_path: Optional[Union[str, Path]] = None,
+) -> FrameIndex:
+    video_path = Path(video_path)
+    index_path = Path(index_path) if index_path else default_index_path(video_path)
+    index = load_frame_index(index_path)
+    if index is not None:
+        size, mtime_ns = _video_stat(video_path)
+        if index.video_size == size and index.video_mtime_ns == mtime_ns:
+            return index
+    index = build_frame_index(video_path)
+    save_frame_index(index, index_path)
+    return index
+
+
+def seek_to_frame(cap: cv2.VideoCapture, index: FrameIndex, frame_index: int) -> int:
+    """Position ``cap`` so the next read returns ``frame_index``.
+
+    Seeks by indexed timestamp to the nearest keyframe before the target,
+    checks where the capture actually landed from the decoded frame's
+    timestamp, and grabs forward. If the landing cannot be verified it falls
+    back to earlier keyframes and finally to decoding from the start.
+    Returns the frame index the capture is actually positioned at.
+    """
+    if frame_index <= 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        return 0
+    position = None
+    keyframe = index.nearest_keyframe(frame_index - 1)
+    while keyframe > 0:
+        ts_ms = index.timestamps_ms[keyframe] if keyframe < len(index.timestamps_ms) else None
+        if ts_ms is not None and cap.set(cv2.CAP_PROP_POS_MSEC, ts_ms) and cap.grab():
+            landed = index.frame_at_timestamp(cap.get(cv2.CAP_PROP_POS_MSEC))
+            if landed is not None and landed < frame_index:
+                position = landed + 1
+                break
+        keyframe = index.nearest_keyframe(keyframe - 1)
+    if position is None:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        position = 0
+    while position < frame_index:
+        if not cap.grab():
+            break
+        position += 1
+    return position
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build sidecar frame index")
+    parser.add_argument("--video", required=True, help="Path to input video")
+    parser.add_argument("--index", default=None, help="Index path (default: next to video)")
+    return parser.parse_args()
+
+
+def run() -> int:
+    args = parse_args()
+    index_path = Path(args.index) if args.index else default_index_path(args.video)
+    index = build_frame_index(args.video)
+    save_frame_index(index, index_path)
+    print(f"{index_path}: {index.frame_count} frames, {len(index.keyframes)} keyframes")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(run())
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import bisect
 import json
-from typing import IO, Iterable
+from pathlib import Path
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Union
 
 from .tracker import Event
 
+# sink queue policies; defined here so the CLI can offer them without importing sinks
+QUEUE_POLICIES = ("drop_oldest", "drop_newest", "block")
+
 
 def event_to_dict(event: Event) -> dict:
     data = {
@@ -35,3 +40,200 @@ def event_to_dict(event: Event) -> dict:
 def write_events_jsonl(handle: IO[str], events: Iterable[Event]) -> None:
     for event in events:
         handle.write(json.dumps(event_to_dict(event), ensure_ascii=False) + "\n")
+
+
+EVENT_INDEX_VERSION = 1
+POSTING_KEYS = ("event", "side", "kind_guess", "track_id")
+
+
+def default_event_index_path(events_path: Union[str, Path]) -> Path:
+    events_path = Path(events_path)
+    return events_path.with_name(events_path.stem + ".index.json")
+
+
+class IndexedEventWriter:
+    """Write events as JSONL while collecting byte offsets for a sidecar index.
+
+    Records are grouped into blocks that start on frame boundaries; postings
+    map ``event``/``side``/``kind_guess``/``track_id`` values to the blocks
+    containing them, so the index grows with blocks rather than records.
+    ``handle`` must be opened with ``newline="\n"`` so offsets stay exact.
+    """
+
+    def __init__(self, handle: IO[str], block_records: int = 1024) -> None:
+        self.handle = handle
+        self.block_records = max(1, block_records)
+        self._offset = 0
+        self._blocks: List[list] = []
+        self._block_count = 0
+        self._last_frame: Optional[int] = None
+        self._postings: Dict[str, Dict[str, List[int]]] = {key: {} for key in POSTING_KEYS}
+
+    def write(self, events: Iterable[Event]) -> None:
+        for event in events:
+            data = event_to_dict(event)
+            line = json.dumps(data, ensure_ascii=False) + "\n"
+            if self._last_frame != event.frame and (
+                not self._blocks or self._block_count >= self.block_records
+            ):
+                self._blocks.append([event.frame, event.t, self._offset])
+                self._block_count = 0
+            block_id = len(self._blocks) - 1
+            for key in POSTING_KEYS:
+                value = data.get(key)
+                if value is None:
+                    continue
+                blocks = self._postings[key].setdefault(str(value), [])
+                if not blocks or blocks[-1] != block_id:
+                    blocks.append(block_id)
+            self.handle.write(line)
+            self._offset += len(line.encode("utf-8"))
+            self._block_count += 1
+            self._last_frame = event.frame
+
+    def build_index(self) -> dict:
+        return {
+            "version": EVENT_INDEX_VERSION,
+            "size": self._offset,
+            "blocks": self._blocks,
+            "postings": self._postings,
+        }
+
+
+def write_event_index(path: Union[str, Path], index: dict) -> None:
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        json.dump(index, handle)
+    tmp_path.replace(path)
+
+
+def _record_matches(
+    data: dict,
+    frame_start: Optional[int],
+    frame_end: Optional[int],
+    t_start: Optional[float],
+    t_end: Optional[float],
+    filters: Dict[str, Union[str, int]],
+) -> bool:
+    frame = data["frame"]
+    if frame_start is not None and frame < frame_start:
+        return False
+    if frame_end is not None and frame >= frame_end:
+        return False
+    if t_start is not None or t_end is not None:
+        t = data.get("t")
+        if t is None:
+            return False
+        if t_start is not None and t < t_start:
+            return False
+        if t_end is not None and t >= t_end:
+            return False
+    for key, value in filters.items():
+        if data.get(key) != value:
+            return False
+    return True
+
+
+class EventStore:
+    """Lazy query access to ``events.jsonl`` through its sidecar index."""
+
+    def __init__(
+        self,
+        events_path: Union[str, Path],
+        index_path: Optional[Union[str, Path]] = None,
+    ) -> None:
+        self.events_path = Path(events_path)
+        self.index_path = (
+            Path(index_path) if index_path else default_event_index_path(self.events_path)
+        )
+        self._index: Optional[dict] = None
+        self._block_frames: List[int] = []
+
+    @property
+    def index(self) -> dict:
+        if self._index is None:
+            with self.index_path.open("r", encoding="utf-8") as handle:
+                index = json.load(handle)
+            if index.get("version") != EVENT_INDEX_VERSION:
+                raise ValueError(f"Unsupported event index version: {self.index_path}")
+            if index.get("size") != self.events_path.stat().st_size:
+                raise ValueError(f"Event index does not match {self.events_path}")
+            self._index = index
+            self._block_frames = [b[0] for b in index["blocks"]]
+        return self._index
+
+    def track(self, track_id: int) -> Iterator[dict]:
+        return self.query(track_id=track_id)
+
+    def _candidate_blocks(
+        self,
+        frame_start: Optional[int],
+        frame_end: Optional[int],
+        t_start: Optional[float],
+        t_end: Optional[float],
+        filters: Dict[str, Union[str, int]],
+    ) -> List[int]:
+        blocks = self.index["blocks"]
+        block_frames = self._block_frames
+        first = 0
+        last = len(blocks)
+        if frame_start is not None:
+            first = max(0, bisect.bisect_right(block_frames, frame_start) - 1)
+        if frame_end is not None:
+            last = bisect.bisect_left(block_frames, frame_end)
+        block_ids = [
+            i for i in range(first, last) if self._block_in_time(i, t_start, t_end)
+        ]
+        selected = set(block_ids)
+        postings = self.index["postings"]
+        for key, value in filters.items():
+            selected &= set(postings.get(key, {}).get(str(value), []))
+        return sorted(selected)
+
+    def _block_in_time(self, block_id: int, t_start: Optional[float], t_end: Optional[float]) -> bool:
+        blocks = self.index["blocks"]
+        block_t = blocks[block_id][1]
+        if block_t is None:
+            return True
+        if t_end is not None and block_t >= t_end:
+            return False
+        if t_start is not None and block_id + 1 < len(blocks):
+            next_t = blocks[block_id + 1][1]
+            if next_t is not None and next_t < t_start:
+                return False
+        return True
+
+    def query(
+        self,
+        frame_start: Optional[int] = None,
+        frame_end: Optional[int] = None,
+        t_start: Optional[float] = None,
+        t_end: Optional[float] = None,
+        event: Optional[str] = None,
+        side: Optional[str] = None,
+        kind_guess: Optional[str] = None,
+        track_id: Optional[int] = None,
+    ) -> Iterator[dict]:
+        filters = {
+            key: value
+            for key, value in (
+                ("event", event),
+                ("side", side),
+                ("kind_guess", kind_guess),
+                ("track_id", track_id),
+            )
+            if value is not None
+        }
+        blocks = self.index["blocks"]
+        size = self.index["size"]
+        block_ids = self._candidate_blocks(frame_start, frame_end, t_start, t_end, filters)
+        with self.events_path.open("rb") as handle:
+            for block_id in block_ids:
+                start = blocks[block_id][2]
+                end = blocks[block_id + 1][2] if block_id + 1 < len(blocks) else size
+                handle.seek(start)
+                for line in handle.read(end - start).splitlines():
+                    data = json.loads(line)
+                    if _record_matches(data, frame_start, frame_end, t_start, t_end, filters):
+                        yield data
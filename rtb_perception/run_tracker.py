@@ -7,21 +7,36 @@ from typing import List, Optional, Tuple
 
 import cv2
 
-from .diff_bbox import compute_roi_bounds, extract_diff_bboxes
-from .io import write_events_jsonl
+from .diff_bbox import DiffDetector
+from .diff_mask import load_diff_mask
+from .io import (
+    QUEUE_POLICIES,
+    IndexedEventWriter,
+    default_event_index_path,
+    write_event_index,
+)
 from .tracker import UnitTracker
-from .visualize import draw_debug_frame
 
 Bbox = Tuple[int, int, int, int]
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Run diff-based tracking")
     parser.add_argument("--video", required=True, help="Path to input video")
     parser.add_argument("--out", required=True, help="Output directory")
     parser.add_argument("--start", type=int, default=0, help="Start frame index")
     parser.add_argument("--end", type=int, default=None, help="End frame index (exclusive)")
     parser.add_argument("--debug", action="store_true", help="Save debug images")
+    parser.add_argument(
+        "--frame-index",
+        action="store_true",
+        help="Use sidecar frame index for keyframe seeking and timestamps",
+    )
+    parser.add_argument(
+        "--frame-index-path",
+        default=None,
+        help="Frame index path (default: <video>.frameindex.json)",
+    )
     parser.add_argument("--diff-threshold", type=int, default=25, help="Diff threshold")
     parser.add_argument(
         "--blur", type=int, default=0, help="Gaussian blur kernel size (0 disables)"
@@ -38,12 +53,86 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--roi-bottom", type=float, default=0.74, help="ROI bottom ratio")
     parser.add_argument("--roi-left", type=float, default=0.0, help="ROI left ratio")
     parser.add_argument("--roi-right", type=float, default=1.0, help="ROI right ratio")
+    parser.add_argument(
+        "--diff-mask",
+        default=None,
+        help="Exclusion mask image or JSON with polygons and per-region thresholds",
+    )
+    parser.add_argument(
+        "--tiles",
+        type=int,
+        default=1,
+        help="Horizontal ROI strips processed in parallel for diff detection",
+    )
+    parser.add_argument(
+        "--storm-ratio",
+        type=float,
+        default=0.0,
+        help="Changed-pixel fraction of the ROI that marks a flash/cut frame (0 disables)",
+    )
+    parser.add_argument(
+        "--flash-luma-delta",
+        type=float,
+        default=20.0,
+        help="Mean luma shift separating flash from cut frames",
+    )
+    parser.add_argument(
+        "--flash-policy",
+        choices=["skip", "freeze", "reset"],
+        default="freeze",
+        help="Tracker handling of flash frames",
+    )
+    parser.add_argument(
+        "--cut-policy",
+        choices=["skip", "freeze", "reset"],
+        default="reset",
+        help="Tracker handling of scene-cut frames",
+    )
+    parser.add_argument(
+        "--max-detections", type=int, default=100, help="Max diff boxes per frame (largest kept)"
+    )
+    parser.add_argument(
+        "--max-candidates", type=int, default=200, help="Max pending spawn candidates"
+    )
+    parser.add_argument(
+        "--max-tracks", type=int, default=100, help="Max active tracks (stalest evicted)"
+    )
     parser.add_argument(
         "--side-split",
         type=float,
         default=0.50,
         help="Board split ratio to infer enemy/friendly side",
     )
+    parser.add_argument(
+        "--output-mode",
+        choices=["events", "trajectory"],
+        default="events",
+        help="events: update per track per frame; trajectory: one record per track",
+    )
+    parser.add_argument(
+        "--traj-epsilon",
+        type=float,
+        default=1.0,
+        help="Max box error in pixels for trajectory keyframe decimation (0 keeps all)",
+    )
+    parser.add_argument(
+        "--sink",
+        default=None,
+        help="Also publish events to tcp://host:port, unix:///path or http(s)://host/path",
+    )
+    parser.add_argument("--sink-queue-size", type=int, default=256, help="Sink queue size")
+    parser.add_argument(
+        "--sink-policy",
+        choices=QUEUE_POLICIES,
+        default="drop_oldest",
+        help="Sink behavior when its queue is full",
+    )
+    parser.add_argument(
+        "--sink-batch-interval",
+        type=float,
+        default=0.0,
+        help="Seconds of events coalesced per sink send (0 sends per frame)",
+    )
     parser.add_argument("--iou-thresh", type=float, default=0.3, help="IoU threshold")
     parser.add_argument(
         "--confirm-frames", type=int, default=2, help="Frames to confirm spawn"
@@ -67,7 +156,7 @@ def parse_args() -> argparse.Namespace:
         default=10,
         help="Min track age for area_spell vs impact_effect",
     )
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
 def prepare_frame_pair(frame_buffer: deque, diff_step: int):
@@ -78,8 +167,8 @@ def prepare_frame_pair(frame_buffer: deque, diff_step: int):
     return frame_buffer[0], frame_buffer[-1]
 
 
-def run() -> int:
-    args = parse_args()
+def run(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
     if args.diff_step < 1:
         raise ValueError("diff_step must be >= 1")
     video_path = Path(args.video)
@@ -87,83 +176,141 @@ def run() -> int:
     out_dir.mkdir(parents=True, exist_ok=True)
     debug_dir = out_dir / "debug"
     if args.debug:
+        # only needed for debug output; keeps plain runs from importing it
+        from .visualize import draw_debug_frame
+
         debug_dir.mkdir(parents=True, exist_ok=True)
 
     cap = cv2.VideoCapture(str(video_path))
     if not cap.isOpened():
         raise RuntimeError(f"Failed to open video: {video_path}")
 
-    if args.start > 0:
-        cap.set(cv2.CAP_PROP_POS_FRAMES, args.start)
-
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    tracker = UnitTracker(
-        iou_thresh=args.iou_thresh,
-        confirm_frames=args.confirm_frames,
-        max_missed=args.max_missed,
-        kind_window=args.kind_window,
-        kind_move_thresh=args.kind_move_thresh,
-        effect_min_age=args.effect_min_age,
-    )
-    events_path = out_dir / "events.jsonl"
-
-    frame_buffer = deque(maxlen=args.diff_step + 1)
-    frame_index = args.start
-
-    with events_path.open("w", encoding="utf-8") as handle:
-        while True:
-            if args.end is not None and frame_index >= args.end:
-                break
-            ok, frame = cap.read()
-            if not ok:
-                break
-
-            frame_buffer.append(frame)
-            pair = prepare_frame_pair(frame_buffer, args.diff_step)
-            if pair is None:
-                frame_index += 1
-                continue
-
-            prev_frame, curr_frame = pair
-            diff_bboxes = extract_diff_bboxes(
-                prev_frame,
-                curr_frame,
-                threshold=args.diff_threshold,
-                min_area=args.min_area,
-                kernel_size=args.kernel_size,
-                blur_ksize=args.blur,
-                roi_top=args.roi_top,
-                roi_bottom=args.roi_bottom,
-                roi_left=args.roi_left,
-                roi_right=args.roi_right,
+    detector: Optional[DiffDetector] = None
+    sink = None
+    try:
+        frame_index_data = None
+        if args.frame_index:
+            from .frame_index import load_or_build_frame_index, seek_to_frame
+
+            frame_index_data = load_or_build_frame_index(video_path, args.frame_index_path)
+
+        start_frame = args.start
+        if args.start > 0:
+            if frame_index_data is not None:
+                start_frame = seek_to_frame(cap, frame_index_data, args.start)
+            else:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, args.start)
+
+        fps = cap.get(cv2.CAP_PROP_FPS)
+
+        def frame_time(index: int) -> Optional[float]:
+            if frame_index_data is not None:
+                return frame_index_data.time_sec(index)
+            return index / fps if fps and fps > 0 else None
+
+        tracker = UnitTracker(
+            iou_thresh=args.iou_thresh,
+            confirm_frames=args.confirm_frames,
+            max_missed=args.max_missed,
+            kind_window=args.kind_window,
+            kind_move_thresh=args.kind_move_thresh,
+            effect_min_age=args.effect_min_age,
+            output_mode=args.output_mode,
+            traj_epsilon=args.traj_epsilon,
+            flash_policy=args.flash_policy,
+            cut_policy=args.cut_policy,
+            max_detections=args.max_detections,
+            max_candidates=args.max_candidates,
+            max_tracks=args.max_tracks,
+        )
+        detector = DiffDetector(
+            threshold=args.diff_threshold,
+            min_area=args.min_area,
+            kernel_size=args.kernel_size,
+            blur_ksize=args.blur,
+            roi_top=args.roi_top,
+            roi_bottom=args.roi_bottom,
+            roi_left=args.roi_left,
+            roi_right=args.roi_right,
+            diff_mask=load_diff_mask(args.diff_mask) if args.diff_mask else None,
+            storm_ratio=args.storm_ratio,
+            flash_luma_delta=args.flash_luma_delta,
+            tiles=args.tiles,
+        )
+        events_path = out_dir / "events.jsonl"
+        # a stale index from a previous run must not outlive the file it described
+        default_event_index_path(events_path).unlink(missing_ok=True)
+        if args.sink:
+            from .sinks import open_sink
+
+            sink = open_sink(
+                args.sink,
+                queue_size=args.sink_queue_size,
+                policy=args.sink_policy,
+                batch_interval=args.sink_batch_interval,
             )
-            time_sec = frame_index / fps if fps and fps > 0 else None
-            split_y = int(curr_frame.shape[0] * args.side_split)
-            events = tracker.update(frame_index, diff_bboxes, time_sec, split_y=split_y)
-            write_events_jsonl(handle, events)
-
-            if args.debug:
-                roi_rect = compute_roi_bounds(
-                    curr_frame.shape,
-                    roi_top=args.roi_top,
-                    roi_bottom=args.roi_bottom,
-                    roi_left=args.roi_left,
-                    roi_right=args.roi_right,
-                )
-                debug_img = draw_debug_frame(
-                    curr_frame,
-                    tracker.get_tracks(),
-                    events,
-                    tracker.get_candidates(),
-                    diff_bboxes=diff_bboxes,
-                    roi_rect=roi_rect,
+
+        frame_buffer = deque(maxlen=args.diff_step + 1)
+        frame_index = start_frame
+
+        with events_path.open("w", encoding="utf-8", newline="\n") as handle:
+            writer = IndexedEventWriter(handle)
+            while True:
+                if args.end is not None and frame_index >= args.end:
+                    break
+                ok, frame = cap.read()
+                if not ok:
+                    break
+
+                frame_buffer.append(frame)
+                pair = prepare_frame_pair(frame_buffer, args.diff_step)
+                if pair is None:
+                    frame_index += 1
+                    continue
+
+                prev_frame, curr_frame = pair
+                diff_bboxes = detector.detect(prev_frame, curr_frame)
+                time_sec = frame_time(frame_index)
+                split_y = int(curr_frame.shape[0] * args.side_split)
+                events = tracker.update(
+                    frame_index,
+                    diff_bboxes,
+                    time_sec,
+                    split_y=split_y,
+                    frame_class=detector.frame_class,
                 )
-                debug_path = debug_dir / f"frame_{frame_index:06d}.jpg"
-                cv2.imwrite(str(debug_path), debug_img)
+                writer.write(events)
+                if sink is not None:
+                    sink.publish(events)
+
+                if args.debug:
+                    roi_rect = detector.configured_roi
+                    debug_img = draw_debug_frame(
+                        curr_frame,
+                        tracker.get_tracks(),
+                        events,
+                        tracker.get_candidates(),
+                        diff_bboxes=diff_bboxes,
+                        roi_rect=roi_rect,
+                    )
+                    debug_path = debug_dir / f"frame_{frame_index:06d}.jpg"
+                    cv2.imwrite(str(debug_path), debug_img)
+
+                frame_index += 1
 
-            frame_index += 1
+            final_frame = max(start_frame, frame_index - 1)
+            final_events = tracker.finish(final_frame, frame_time(final_frame))
+            writer.write(final_events)
+            if sink is not None:
+                sink.publish(final_events)
 
-    cap.release()
+        write_event_index(default_event_index_path(events_path), writer.build_index())
+    finally:
+        if sink is not None:
+            sink.close()
+        if detector is not None:
+            detector.close()
+        cap.release()
     return 0
 
 
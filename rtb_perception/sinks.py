@@ -0,0 +1,379 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import json
+import ssl
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence
+from urllib.parse import urlsplit
+
+from .io import QUEUE_POLICIES, event_to_dict
+from .tracker import Event
+
+
+class SinkRejected(Exception):
+    """The consumer refused a batch; resending it would fail the same way."""
+
+
+class Transport(ABC):
+    @abstractmethod
+    async def connect(self) -> None:
+        ...
+
+    @abstractmethod
+    async def send(self, records: List[dict]) -> None:
+        ...
+
+    @abstractmethod
+    async def close(self) -> None:
+        ...
+
+
+class StreamTransport(Transport):
+    """Writes each batch as JSONL lines over a TCP or Unix stream socket."""
+
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        path: Optional[str] = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.path = path
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def connect(self) -> None:
+        if self.path is not None:
+            _, self._writer = await asyncio.open_unix_connection(self.path)
+        else:
+            _, self._writer = await asyncio.open_connection(self.host, self.port)
+
+    async def send(self, records: List[dict]) -> None:
+        if self._writer is None:
+            raise ConnectionError("transport not connected")
+        payload = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+        self._writer.write(payload.encode("utf-8"))
+        await self._writer.drain()
+
+    async def close(self) -> None:
+        if self._writer is None:
+            return
+        writer, self._writer = self._writer, None
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+
+class HttpTransport(Transport):
+    """POSTs each batch as a JSON array over a keep-alive HTTP/1.1 connection."""
+
+    def __init__(self, url: str) -> None:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported HTTP sink URL: {url}")
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.path = parts.path or "/"
+        if parts.query:
+            self.path += "?" + parts.query
+        self.ssl = ssl.create_default_context() if parts.scheme == "https" else None
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_connection(
+            self.host, self.port, ssl=self.ssl
+        )
+
+    async def send(self, records: List[dict]) -> None:
+        if self._writer is None or self._reader is None:
+            raise ConnectionError("transport not connected")
+        body = json.dumps(records, ensure_ascii=False).encode("utf-8")
+        head = (
+            f"POST {self.path} HTTP/1.1\r\n"
+            f"Host: {self.host}:{self.port}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        )
+        self._writer.write(head.encode("ascii") + body)
+        await self._writer.drain()
+
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed by server")
+        parts = status_line.split()
+        if len(parts) < 2 or not parts[1].isdigit():
+            raise ConnectionError(f"malformed HTTP status line: {status_line[:80]!r}")
+        status = int(parts[1])
+        length: Optional[int] = None
+        chunked = False
+        keep_alive = True
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            name = name.strip().lower()
+            value = value.strip().lower()
+            if name == "content-length":
+                length = int(value)
+            elif name == "transfer-encoding" and value.endswith("chunked"):
+                chunked = True
+            elif name == "connection" and value == "close":
+                keep_alive = False
+        if chunked:
+            await self._read_chunked()
+        elif length is not None:
+            await self._reader.readexactly(length)
+        elif status >= 200 and status not in (204, 304):
+            # no framing: the body runs until the server closes the connection
+            await self._reader.read()
+            keep_alive = False
+        if not keep_alive:
+            await self.close()
+        if 400 <= status < 500:
+            raise SinkRejected(f"sink returned HTTP {status}")
+        if not 200 <= status < 300:
+            raise ConnectionError(f"sink returned HTTP {status}")
+
+    async def _read_chunked(self) -> None:
+        while True:
+            size_line = await self._reader.readline()
+            try:
+                size = int(size_line.split(b";")[0].strip(), 16)
+            except ValueError:
+                raise ConnectionError(f"malformed chunk size: {size_line[:80]!r}") from None
+            if size == 0:
+                # skip trailers up to the blank line that ends the message
+                while (await self._reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return
+            await self._reader.readexactly(size + 2)
+
+    async def close(self) -> None:
+        if self._writer is None:
+            return
+        writer, self._writer, self._reader = self._writer, None, None
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+
+def transport_from_url(url: str) -> Transport:
+    parts = urlsplit(url)
+    if parts.scheme == "tcp":
+        if parts.hostname is None or parts.port is None:
+            raise ValueError(f"TCP sink URL needs host and port: {url}")
+        return StreamTransport(host=parts.hostname, port=parts.port)
+    if parts.scheme == "unix":
+        return StreamTransport(path=parts.path)
+    if parts.scheme in ("http", "https"):
+        return HttpTransport(url)
+    raise ValueError(f"Unsupported sink URL: {url}")
+
+
+class AsyncEventSink:
+    """Publishes event batches from a background asyncio loop.
+
+    ``publish`` hands events to a bounded queue owned by the loop thread and
+    returns without waiting for the network. When the queue is full,
+    ``drop_oldest``/``drop_newest`` discard a batch immediately and ``block``
+    waits up to ``block_timeout`` seconds before dropping the new batch, so a
+    slow or absent consumer never stalls the tracker loop indefinitely.
+    Batches published within ``batch_interval`` seconds are coalesced into one
+    send (0 sends one batch per frame). Failed sends reconnect with
+    exponential backoff and retry the same batch; batches the consumer
+    rejects (HTTP 4xx) are dropped without retry. ``sent`` and ``dropped``
+    count events and are only updated on the loop thread.
+    """
+
+    def __init__(
+        self,
+        transport: Transport,
+        queue_size: int = 256,
+        policy: str = "drop_oldest",
+        batch_interval: float = 0.0,
+        max_batch_events: int = 1000,
+        block_timeout: float = 0.05,
+        reconnect_initial: float = 0.1,
+        reconnect_max: float = 5.0,
+    ) -> None:
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"policy must be one of {QUEUE_POLICIES}")
+        self.transport = transport
+        self.queue_size = max(1, queue_size)
+        self.policy = policy
+        self.batch_interval = max(0.0, batch_interval)
+        self.max_batch_events = max(1, max_batch_events)
+        self.block_timeout = block_timeout
+        self.reconnect_initial = reconnect_initial
+        self.reconnect_max = reconnect_max
+        self.sent = 0
+        self.dropped = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._closing: Optional[asyncio.Event] = None
+        self._thread: Optional[threading.Thread] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._connected = False
+        self._deadline: Optional[float] = None
+        self._started = threading.Event()
+
+    def start(self) -> "AsyncEventSink":
+        if self._thread is not None:
+            return self
+        self._thread = threading.Thread(target=self._run_loop, name="event-sink", daemon=True)
+        self._thread.start()
+        self._started.wait()
+        return self
+
+    def __enter__(self) -> "AsyncEventSink":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _run_loop(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._closing = asyncio.Event()
+        self._worker = self._loop.create_task(self._drain())
+        self._loop.call_soon(self._started.set)
+        self._loop.run_until_complete(self._worker)
+        self._loop.run_until_complete(self.transport.close())
+        self._loop.close()
+
+    def publish(self, events: Sequence[Event]) -> bool:
+        """Queue one batch; returns False if it was dropped."""
+        if not events:
+            return True
+        records = [event_to_dict(event) for event in events]
+        if self._thread is None or not self._thread.is_alive():
+            # no loop thread left to race with
+            self.dropped += len(records)
+            return False
+        if self.policy == "block":
+            # the loop enforces block_timeout and counts the drop itself; the
+            # outer bound only guards against a stalled loop
+            future = asyncio.run_coroutine_threadsafe(self._put_wait(records), self._loop)
+            try:
+                return future.result(self.block_timeout + 1.0)
+            except concurrent.futures.TimeoutError:
+                future.cancel()
+                self._loop.call_soon_threadsafe(self._count_dropped, len(records))
+                return False
+        self._loop.call_soon_threadsafe(self._put_nowait, records)
+        return True
+
+    def _count_dropped(self, count: int) -> None:
+        self.dropped += count
+
+    def _put_nowait(self, records: List[dict]) -> None:
+        if self._queue.full():
+            if self.policy == "drop_newest":
+                self.dropped += len(records)
+                return
+            self.dropped += len(self._queue.get_nowait())
+        self._queue.put_nowait(records)
+
+    async def _put_wait(self, records: List[dict]) -> bool:
+        try:
+            await asyncio.wait_for(self._queue.put(records), self.block_timeout)
+        except asyncio.TimeoutError:
+            self.dropped += len(records)
+            return False
+        return True
+
+    async def _next_batch(self) -> Optional[List[dict]]:
+        item = await self._queue.get()
+        if item is None:
+            return None
+        batch = list(item)
+        deadline = time.monotonic() + self.batch_interval
+        while len(batch) < self.max_batch_events:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                break
+            if item is None:
+                # re-queue the stop marker so the drain loop exits after this batch
+                self._queue.put_nowait(None)
+                break
+            batch.extend(item)
+        return batch
+
+    async def _send(self, batch: List[dict]) -> bool:
+        backoff = self.reconnect_initial
+        while True:
+            try:
+                if not self._connected:
+                    await self.transport.connect()
+                    self._connected = True
+                await self.transport.send(batch)
+                return True
+            except SinkRejected:
+                return False
+            except (ConnectionError, OSError, asyncio.IncompleteReadError, ValueError):
+                self._connected = False
+                await self.transport.close()
+            if self._deadline is not None and time.monotonic() + backoff > self._deadline:
+                return False
+            try:
+                # closing cuts the backoff short so close() is not held up by it
+                await asyncio.wait_for(self._closing.wait(), backoff)
+            except asyncio.TimeoutError:
+                pass
+            backoff = min(backoff * 2, self.reconnect_max)
+
+    async def _drain(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            if batch is None:
+                return
+            try:
+                sent = await self._send(batch)
+            except Exception:
+                # an unexpected failure costs this batch, never the worker
+                sent = False
+                self._connected = False
+                await self.transport.close()
+            if sent:
+                self.sent += len(batch)
+            else:
+                self.dropped += len(batch)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush queued batches for up to ``timeout`` seconds, then stop."""
+        if self._thread is None:
+            return
+
+        def stop() -> None:
+            self._deadline = time.monotonic() + timeout
+            self._closing.set()
+            try:
+                self._queue.put_nowait(None)
+            except asyncio.QueueFull:
+                # wait for the drain loop to free a slot instead of dropping data
+                self._loop.create_task(self._queue.put(None))
+
+        self._loop.call_soon_threadsafe(stop)
+        self._thread.join(timeout + 1.0)
+        self._thread = None
+
+
+def open_sink(url: str, **kwargs) -> AsyncEventSink:
+    return AsyncEventSink(transport_from_url(url), **kwargs).start()
@@ -5,6 +5,10 @@ import math
 from typing import Dict, Iterable, List, Optional, Tuple
 
 from .matching import Bbox, Match, greedy_match
+from .trajectory import TrajectoryBuffer, encode_trajectory
+
+OUTPUT_MODES = ("events", "trajectory")
+FRAME_POLICIES = ("skip", "freeze", "reset")
 
 
 @dataclass
@@ -18,6 +22,7 @@ class Track:
     dist_sum: float = 0.0
     side: Optional[str] = None
     kind_guess: str = "unknown"
+    trajectory: Optional[TrajectoryBuffer] = None
 
 
 @dataclass
@@ -53,13 +58,31 @@ class UnitTracker:
         kind_window: int = 6,
         kind_move_thresh: float = 10.0,
         effect_min_age: int = 10,
+        output_mode: str = "events",
+        traj_epsilon: float = 1.0,
+        flash_policy: str = "freeze",
+        cut_policy: str = "reset",
+        max_detections: Optional[int] = 100,
+        max_candidates: Optional[int] = 200,
+        max_tracks: Optional[int] = 100,
     ) -> None:
+        if output_mode not in OUTPUT_MODES:
+            raise ValueError(f"output_mode must be one of {OUTPUT_MODES}")
+        if flash_policy not in FRAME_POLICIES or cut_policy not in FRAME_POLICIES:
+            raise ValueError(f"flash_policy and cut_policy must be one of {FRAME_POLICIES}")
         self.iou_thresh = iou_thresh
         self.confirm_frames = confirm_frames
         self.max_missed = max_missed
         self.kind_window = max(1, kind_window)
         self.kind_move_thresh = kind_move_thresh
         self.effect_min_age = max(1, effect_min_age)
+        self.output_mode = output_mode
+        self.traj_epsilon = max(0.0, traj_epsilon)
+        self.flash_policy = flash_policy
+        self.cut_policy = cut_policy
+        self.max_detections = max_detections
+        self.max_candidates = max_candidates
+        self.max_tracks = max_tracks
         self._next_id = 1
         self.tracks: Dict[int, Track] = {}
         self._candidates: List[Candidate] = []
@@ -76,6 +99,9 @@ class UnitTracker:
             side=None,
             kind_guess="unknown",
         )
+        if self.output_mode == "trajectory":
+            track.trajectory = TrajectoryBuffer()
+            track.trajectory.append(frame_index, bbox)
         self._next_id += 1
         self.tracks[track.track_id] = track
         return track
@@ -85,6 +111,11 @@ class UnitTracker:
         x1, y1, x2, y2 = bbox
         return ((x1 + x2) / 2.0, (y1 + y2) / 2.0)
 
+    @staticmethod
+    def _bbox_area(bbox: Bbox) -> int:
+        x1, y1, x2, y2 = bbox
+        return (x2 - x1) * (y2 - y1)
+
     @staticmethod
     def _infer_side(center: Tuple[float, float], split_y: Optional[int]) -> Optional[str]:
         if split_y is None:
@@ -120,6 +151,77 @@ class UnitTracker:
     def _refresh_kind_guess(self, track: Track) -> None:
         track.kind_guess = self._infer_kind_guess(track)
 
+    def _trajectory_event(
+        self,
+        track: Track,
+        frame_index: int,
+        time_sec: Optional[float],
+    ) -> Event:
+        return Event(
+            event="trajectory",
+            frame=frame_index,
+            t=time_sec,
+            track_id=track.track_id,
+            bbox=track.bbox,
+            age=track.age,
+            missed=track.missed_frames,
+            side=track.side,
+            kind_guess=track.kind_guess,
+            meta=encode_trajectory(track.trajectory, self.traj_epsilon),
+        )
+
+    def _disappear_events(
+        self,
+        track: Track,
+        frame_index: int,
+        time_sec: Optional[float],
+        reason: Optional[str] = None,
+    ) -> List[Event]:
+        events = [
+            Event(
+                event="disappear",
+                frame=frame_index,
+                t=time_sec,
+                track_id=track.track_id,
+                bbox=track.bbox,
+                age=track.age,
+                missed=track.missed_frames,
+                center=self._bbox_center(track.bbox),
+                side=track.side,
+                kind_guess=track.kind_guess,
+                meta={"reason": reason} if reason else None,
+            )
+        ]
+        if track.trajectory is not None:
+            events.append(self._trajectory_event(track, frame_index, time_sec))
+        return events
+
+    def _evict_for_spawn(
+        self,
+        frame_index: int,
+        time_sec: Optional[float],
+        events: List[Event],
+    ) -> bool:
+        # admit a spawn at the cap by dropping the stalest missed track; tracks
+        # seen this frame (including ones just spawned) are never evicted
+        if self.max_tracks is None or len(self.tracks) < self.max_tracks:
+            return True
+        stale = [t for t in self.tracks.values() if t.missed_frames > 0]
+        if not stale:
+            return False
+        victim = max(stale, key=lambda t: (t.missed_frames, -t.age))
+        del self.tracks[victim.track_id]
+        events.extend(self._disappear_events(victim, frame_index, time_sec, reason="evicted"))
+        return True
+
+    def reset(self, frame_index: int, time_sec: Optional[float] = None) -> List[Event]:
+        events: List[Event] = []
+        for track in self.tracks.values():
+            events.extend(self._disappear_events(track, frame_index, time_sec, reason="reset"))
+        self.tracks = {}
+        self._candidates = []
+        return events
+
     def _track_match(self, candidates: List[Bbox]) -> List[Match]:
         track_list = list(self.tracks.values())
         track_bboxes = [t.bbox for t in track_list]
@@ -132,7 +234,19 @@ class UnitTracker:
         candidates: List[Bbox],
         time_sec: Optional[float] = None,
         split_y: Optional[int] = None,
+        frame_class: str = "normal",
     ) -> List[Event]:
+        if frame_class != "normal":
+            policy = self.cut_policy if frame_class == "cut" else self.flash_policy
+            if policy == "freeze":
+                return []
+            if policy == "reset":
+                return self.reset(frame_index, time_sec)
+            candidates = []
+        if self.max_detections is not None and len(candidates) > self.max_detections:
+            candidates = sorted(candidates, key=self._bbox_area, reverse=True)
+            candidates = candidates[: self.max_detections]
+
         events: List[Event] = []
         track_list = list(self.tracks.values())
         track_bboxes = [t.bbox for t in track_list]
@@ -153,6 +267,9 @@ class UnitTracker:
             self._ensure_track_side(track, center, split_y)
             matched_tracks.add(track.track_id)
             matched_candidates.add(match.idx_b)
+            if track.trajectory is not None:
+                track.trajectory.append(frame_index, bbox)
+                continue
             events.append(
                 Event(
                     event="update",
@@ -176,21 +293,7 @@ class UnitTracker:
             track.age += 1
             self._refresh_kind_guess(track)
             if track.missed_frames > self.max_missed:
-                center = self._bbox_center(track.bbox)
-                events.append(
-                    Event(
-                        event="disappear",
-                        frame=frame_index,
-                        t=time_sec,
-                        track_id=track.track_id,
-                        bbox=track.bbox,
-                        age=track.age,
-                        missed=track.missed_frames,
-                        center=center,
-                        side=track.side,
-                        kind_guess=track.kind_guess,
-                    )
-                )
+                events.extend(self._disappear_events(track, frame_index, time_sec))
                 del self.tracks[track.track_id]
 
         unmatched_bboxes = [b for i, b in enumerate(candidates) if i not in matched_candidates]
@@ -213,7 +316,9 @@ class UnitTracker:
             matched_cands.add(match.idx_a)
             matched_unmatched.add(match.idx_b)
 
-            if cand.streak >= self.confirm_frames:
+            if cand.streak >= self.confirm_frames and self._evict_for_spawn(
+                frame_index, time_sec, events
+            ):
                 track = self._new_track(frame_index, bbox)
                 center = self._bbox_center(bbox)
                 self._update_track_kind(track, center)
@@ -247,7 +352,9 @@ class UnitTracker:
         for i, bbox in enumerate(unmatched_bboxes):
             if i in matched_unmatched:
                 continue
-            if self.confirm_frames <= 1:
+            if self.confirm_frames <= 1 and self._evict_for_spawn(
+                frame_index, time_sec, events
+            ):
                 track = self._new_track(frame_index, bbox)
                 center = self._bbox_center(bbox)
                 self._update_track_kind(track, center)
@@ -277,6 +384,23 @@ class UnitTracker:
                 )
             )
 
+        if self.max_candidates is not None and len(self._candidates) > self.max_candidates:
+            self._candidates.sort(key=lambda c: (c.streak, self._bbox_area(c.bbox)), reverse=True)
+            del self._candidates[self.max_candidates :]
+
+        return events
+
+    def finish(self, frame_index: int, time_sec: Optional[float] = None) -> List[Event]:
+        # flush trajectories of tracks still active at the end of the video
+        if self.output_mode != "trajectory":
+            return []
+        events = [
+            self._trajectory_event(track, frame_index, time_sec)
+            for track in self.tracks.values()
+        ]
+        # flushed tracks are closed; a second finish must not repeat them
+        self.tracks = {}
+        self._candidates = []
         return events
 
     def get_tracks(self) -> List[Track]:
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from array import array
+from typing import List, Tuple
+
+import numpy as np
+
+Bbox = Tuple[int, int, int, int]
+
+TRAJECTORY_ENCODING = "delta"
+
+
+class TrajectoryBuffer:
+    """Array-backed per-track storage of observed frames and boxes."""
+
+    __slots__ = ("frames", "boxes")
+
+    def __init__(self) -> None:
+        self.frames = array("q")
+        self.boxes = array("i")
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def append(self, frame_index: int, bbox: Bbox) -> None:
+        self.frames.append(frame_index)
+        self.boxes.extend(bbox)
+
+    def as_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        # copies, so the buffers stay appendable after encoding
+        frames = np.array(self.frames, dtype=np.int64)
+        boxes = np.array(self.boxes, dtype=np.int32).reshape(-1, 4)
+        return frames, boxes
+
+
+def simplify_trajectory(frames: np.ndarray, boxes: np.ndarray, epsilon: float) -> List[int]:
+    """Return indices of keyframes kept within ``epsilon`` pixels.
+
+    Douglas-Peucker over time: linear interpolation between the kept keyframes
+    reproduces every observed box coordinate within ``epsilon``.
+    """
+    n = len(frames)
+    if n <= 2:
+        return list(range(n))
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    boxes_f = boxes.astype(np.float64)
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        span = float(frames[end] - frames[start])
+        ratio = (frames[start + 1 : end] - frames[start]) / span
+        interp = boxes_f[start] + ratio[:, None] * (boxes_f[end] - boxes_f[start])
+        errors = np.abs(boxes_f[start + 1 : end] - interp).max(axis=1)
+        worst = int(errors.argmax())
+        if errors[worst] > epsilon:
+            split = start + 1 + worst
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return [int(i) for i in np.flatnonzero(keep)]
+
+
+def encode_trajectory(buffer: TrajectoryBuffer, epsilon: float = 0.0) -> dict:
+    frames, boxes = buffer.as_arrays()
+    if epsilon > 0:
+        indices = simplify_trajectory(frames, boxes, epsilon)
+        frames = frames[indices]
+        boxes = boxes[indices]
+    frame_deltas = np.diff(frames, prepend=0)
+    box_deltas = np.diff(boxes, axis=0, prepend=np.zeros((1, 4), dtype=boxes.dtype))
+    return {
+        "encoding": TRAJECTORY_ENCODING,
+        "epsilon": epsilon,
+        "observed": len(buffer),
+        "frames": frame_deltas.tolist(),
+        "bboxes": box_deltas.tolist(),
+    }
+
+
+def decode_trajectory(data: dict) -> List[Tuple[int, Bbox]]:
+    if data.get("encoding") != TRAJECTORY_ENCODING:
+        raise ValueError(f"Unsupported trajectory encoding: {data.get('encoding')}")
+    frames = np.cumsum(np.asarray(data["frames"], dtype=np.int64))
+    boxes = np.cumsum(np.asarray(data["bboxes"], dtype=np.int64).reshape(-1, 4), axis=0)
+    return [
+        (int(frame), tuple(int(v) for v in box))
+        for frame, box in zip(frames, boxes)
+    ]
@@ -0,0 +1,67 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from rtb_perception.daemon import _socket_in_use, serve, submit
+
+
+def test_daemon_runs_jobs_on_warm_workers(tmp_path):
+    video = tmp_path / "clip.avi"
+    writer = cv2.VideoWriter(str(video), cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 64))
+    for i in range(6):
+        frame = np.zeros((64, 64, 3), dtype=np.uint8)
+        frame[20:40, 5 + i * 4 : 25 + i * 4] = 255
+        writer.write(frame)
+    writer.release()
+
+    sock = tmp_path / "d.sock"
+    cmd = [sys.executable, "-m", "rtb_perception.daemon", "serve"]
+    cmd += ["--socket", str(sock), "--workers", "1"]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+    try:
+        assert proc.stdout.readline().startswith(b"rtb_perception daemon")
+        out_dir = tmp_path / "out"
+        argv = ["--video", str(video), "--out", str(out_dir)]
+        argv += ["--roi-top", "0", "--roi-bottom", "1"]
+        first = submit(argv, str(sock), timeout=30)
+        second = submit(argv, str(sock), timeout=30)
+        assert first["returncode"] == 0 and second["returncode"] == 0
+        assert first["pid"] == second["pid"]
+        assert (out_dir / "events.jsonl").exists()
+
+        bad = submit(["--out", str(out_dir)], str(sock), timeout=30)
+        assert bad["returncode"] == 2
+
+        # a live daemon's socket is never replaced
+        assert serve(str(sock)) == 1
+        assert submit(argv, str(sock), timeout=30)["returncode"] == 0
+
+        # a worker killed outright must not take the daemon down with it
+        os.kill(first["pid"], signal.SIGKILL)
+        time.sleep(0.5)
+        results = [submit(argv, str(sock), timeout=60) for _ in range(2)]
+        assert results[-1]["returncode"] == 0
+        assert results[-1]["pid"] != first["pid"]
+    finally:
+        proc.terminate()
+        assert proc.wait(timeout=10) == 0
+    assert not sock.exists()
+
+
+def test_serve_only_replaces_stale_sockets(tmp_path):
+    regular = tmp_path / "not-a-socket"
+    regular.write_text("keep", encoding="utf-8")
+    assert serve(str(regular)) == 1
+    assert regular.read_text(encoding="utf-8") == "keep"
+
+    stale = tmp_path / "stale.sock"
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(str(stale))
+    listener.close()
+    assert _socket_in_use(stale) is False
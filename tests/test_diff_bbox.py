@@ -1,4 +1,11 @@
-from rtb_perception.diff_bbox import apply_roi_offset, normalize_blur_ksize
+import numpy as np
+
+from rtb_perception.diff_bbox import (
+    DiffDetector,
+    apply_roi_offset,
+    extract_diff_bboxes,
+    normalize_blur_ksize,
+)
 
 
 def test_apply_roi_offset():
@@ -10,3 +17,61 @@ def test_normalize_blur_ksize_even_to_odd():
     assert normalize_blur_ksize(5) == 5
     assert normalize_blur_ksize(0) == 0
     assert normalize_blur_ksize(-1) == 0
+
+
+def test_diff_detector_matches_stateless_and_reuses_buffers():
+    prev_frame = np.zeros((100, 120, 3), dtype=np.uint8)
+    curr_frame = prev_frame.copy()
+    curr_frame[40:60, 30:50] = 200
+
+    detector = DiffDetector(blur_ksize=3, roi_top=0.0, roi_bottom=1.0)
+    first = detector.detect(prev_frame, curr_frame)
+    buffers = {name: buf.ctypes.data for name, buf in detector._buffers.items()}
+    second = detector.detect(prev_frame, curr_frame)
+
+    expected = extract_diff_bboxes(
+        prev_frame, curr_frame, blur_ksize=3, roi_top=0.0, roi_bottom=1.0
+    )
+    assert first == second == expected
+    assert len(expected) == 1
+    assert {name: buf.ctypes.data for name, buf in detector._buffers.items()} == buffers
+
+
+def test_diff_detector_classifies_flash_and_cut():
+    rng = np.random.default_rng(0)
+    prev_frame = rng.integers(0, 100, (60, 80, 3), dtype=np.uint8)
+    detector = DiffDetector(roi_top=0.0, roi_bottom=1.0, storm_ratio=0.5)
+
+    assert detector.detect(prev_frame, prev_frame + 100) == []
+    assert detector.frame_class == "flash"
+
+    assert detector.detect(prev_frame, 99 - prev_frame) == []
+    assert detector.frame_class == "cut"
+
+    curr_frame = prev_frame.copy()
+    curr_frame[20:40, 20:40] = 255
+    assert len(detector.detect(prev_frame, curr_frame)) == 1
+    assert detector.frame_class == "normal"
+
+
+def test_tiled_detection_matches_untiled():
+    rng = np.random.default_rng(1)
+    prev_frame = rng.integers(0, 255, (240, 160, 3), dtype=np.uint8)
+    curr_frame = prev_frame.copy()
+    # boxes straddling strip borders must come back whole
+    curr_frame[50:130, 20:60] = 255
+    curr_frame[110:125, 80:150] = 0
+    curr_frame[200:230, 10:40] = 255
+    kwargs = dict(blur_ksize=5, kernel_size=3, min_area=20, roi_top=0.0, roi_bottom=1.0)
+
+    expected = DiffDetector(**kwargs).detect(prev_frame, curr_frame)
+    assert len(expected) == 3
+    for tiles in (2, 3, 8):
+        detector = DiffDetector(tiles=tiles, **kwargs)
+        assert detector.detect(prev_frame, curr_frame) == expected
+        detector.close()
+
+    detector = DiffDetector(tiles=4, storm_ratio=0.5, roi_top=0.0, roi_bottom=1.0)
+    assert detector.detect(prev_frame, 255 - prev_frame) == []
+    assert detector.frame_class == "cut"
+    detector.close()
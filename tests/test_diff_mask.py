@@ -0,0 +1,84 @@
+import json
+
+import cv2
+import numpy as np
+
+from rtb_perception.diff_bbox import DiffDetector
+from rtb_perception.diff_mask import (
+    DiffMask,
+    DiffRegion,
+    learn_exclusion_mask,
+    load_diff_mask,
+)
+
+
+def _frames():
+    prev_frame = np.zeros((100, 100, 3), dtype=np.uint8)
+    curr_frame = prev_frame.copy()
+    curr_frame[10:30, 10:30] = 200
+    curr_frame[60:80, 60:80] = 60
+    return prev_frame, curr_frame
+
+
+def test_exclude_polygon_and_region_threshold():
+    prev_frame, curr_frame = _frames()
+    roi = dict(roi_top=0.0, roi_bottom=1.0)
+
+    assert len(DiffDetector(**roi).detect(prev_frame, curr_frame)) == 2
+
+    mask = DiffMask(exclude_polygons=[[(0.0, 0.0), (0.4, 0.0), (0.4, 1.0), (0.0, 1.0)]])
+    detector = DiffDetector(diff_mask=mask, **roi)
+    assert detector.detect(prev_frame, curr_frame) == [(60, 60, 80, 80)]
+    assert detector.roi[0] == 41
+
+    region = DiffRegion(polygon=[(0.5, 0.5), (1.0, 0.5), (1.0, 1.0), (0.5, 1.0)], threshold=100)
+    detector = DiffDetector(diff_mask=DiffMask(regions=[region]), **roi)
+    assert detector.detect(prev_frame, curr_frame) == [(10, 10, 30, 30)]
+
+    region = DiffRegion(polygon=region.polygon, min_area=1000)
+    detector = DiffDetector(diff_mask=DiffMask(regions=[region]), **roi)
+    assert detector.detect(prev_frame, curr_frame) == [(10, 10, 30, 30)]
+
+
+def test_load_json_mask_and_learn(tmp_path):
+    video = tmp_path / "clip.avi"
+    writer = cv2.VideoWriter(str(video), cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for i in range(12):
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        frame[0:8, 0:16] = 255 if i % 2 else 0
+        writer.write(frame)
+    writer.release()
+
+    learned = learn_exclusion_mask(video, dilate=0)
+    assert learned[4, 8] == 255
+    assert learned[30, 40] == 0
+
+    cv2.imwrite(str(tmp_path / "hud.png"), learned)
+    spec = {
+        "exclude_image": "hud.png",
+        "exclude": [[[0.9, 0.9], [1.0, 0.9], [1.0, 1.0]]],
+        "regions": [{"polygon": [[0, 0], [1, 0], [1, 1]], "threshold": 40}],
+    }
+    (tmp_path / "mask.json").write_text(json.dumps(spec), encoding="utf-8")
+    mask = load_diff_mask(tmp_path / "mask.json")
+    assert mask.exclude_image.shape == (48, 64)
+    assert len(mask.exclude_polygons) == 1
+    assert mask.regions[0].threshold == 40
+
+
+def test_learn_masks_slow_timer_but_not_passing_unit(tmp_path):
+    video = tmp_path / "timer.avi"
+    writer = cv2.VideoWriter(str(video), cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for i in range(60):
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        # timer digit ticks once every 10 frames
+        frame[0:8, 0:16] = 255 if (i // 10) % 2 else 0
+        # a unit crosses the arena once
+        x = i
+        frame[30:38, x : x + 4] = 255
+        writer.write(frame)
+    writer.release()
+
+    learned = learn_exclusion_mask(video, window=10, dilate=0)
+    assert learned[4, 8] == 255
+    assert not learned[30:38, :].any()
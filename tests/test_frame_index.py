@@ -0,0 +1,74 @@
+import cv2
+import numpy as np
+
+from rtb_perception.frame_index import (
+    FrameIndex,
+    default_index_path,
+    load_or_build_frame_index,
+    seek_to_frame,
+)
+
+
+def _write_video(path, n_frames=20):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10, (32, 24))
+    for i in range(n_frames):
+        writer.write(np.full((24, 32, 3), i * 10, dtype=np.uint8))
+    writer.release()
+
+
+def test_nearest_keyframe_and_time_sec():
+    index = FrameIndex(
+        frame_count=4,
+        fps=10.0,
+        keyframes=[0, 2],
+        timestamps_ms=[0.0, 50.0, 150.0, None],
+    )
+    assert index.nearest_keyframe(1) == 0
+    assert index.nearest_keyframe(3) == 2
+    assert index.time_sec(2) == 0.15
+    assert index.time_sec(3) == 0.3
+    assert index.frame_at_timestamp(50.2) == 1
+    assert index.frame_at_timestamp(149.6) == 2
+    assert index.frame_at_timestamp(100.0) is None
+    assert index.frame_at_timestamp(300.0) is None
+
+
+def test_build_index_and_seek(tmp_path):
+    video = tmp_path / "clip.avi"
+    _write_video(video)
+
+    index = load_or_build_frame_index(video)
+    assert default_index_path(video).exists()
+    assert index.frame_count == 20
+    assert index.keyframes[0] == 0
+    assert index.timestamps_ms == sorted(index.timestamps_ms)
+
+    cap = cv2.VideoCapture(str(video))
+    assert seek_to_frame(cap, index, 7) == 7
+    ok, frame = cap.read()
+    cap.release()
+    assert ok
+    assert abs(int(frame[0, 0, 0]) - 70) <= 3
+
+
+def test_seek_with_real_gop(tmp_path):
+    video = tmp_path / "clip.mp4"
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 255, (48, 64, 3), dtype=np.uint8)
+    writer = cv2.VideoWriter(str(video), cv2.VideoWriter_fourcc(*"mp4v"), 25, (64, 48))
+    for i in range(60):
+        frame = np.roll(base, i, axis=1)
+        frame[0:8, 0:8] = i * 4
+        writer.write(frame)
+    writer.release()
+
+    index = load_or_build_frame_index(video)
+    assert 1 < len(index.keyframes) < index.frame_count
+
+    for target in (index.keyframes[1], index.keyframes[1] + 5, index.frame_count - 1):
+        cap = cv2.VideoCapture(str(video))
+        assert seek_to_frame(cap, index, target) == target
+        ok, frame = cap.read()
+        cap.release()
+        assert ok
+        assert abs(int(frame[2:6, 2:6].mean()) - target * 4) <= 6
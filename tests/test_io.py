@@ -1,4 +1,12 @@
-from rtb_perception.io import event_to_dict
+import pytest
+
+from rtb_perception.io import (
+    EventStore,
+    IndexedEventWriter,
+    default_event_index_path,
+    event_to_dict,
+    write_event_index,
+)
 from rtb_perception.tracker import Event
 
 
@@ -23,3 +31,54 @@ def test_event_to_dict_omits_none_optionals():
     assert "side" not in data
     assert "kind_guess" not in data
     assert "meta" not in data
+
+
+def test_event_store_queries_by_index(tmp_path):
+    events_path = tmp_path / "events.jsonl"
+    with events_path.open("w", encoding="utf-8", newline="\n") as handle:
+        writer = IndexedEventWriter(handle, block_records=2)
+        for frame in range(10):
+            writer.write(
+                [
+                    Event(
+                        event="spawn" if frame == 0 else "update",
+                        frame=frame,
+                        t=frame * 0.5,
+                        track_id=1,
+                        bbox=(0, 0, 10, 10),
+                        side="enemy",
+                    ),
+                    Event(
+                        event="update",
+                        frame=frame,
+                        t=frame * 0.5,
+                        track_id=2,
+                        bbox=(0, 0, 10, 10),
+                        side="friendly",
+                        kind_guess="unit",
+                    ),
+                ]
+            )
+    write_event_index(default_event_index_path(events_path), writer.build_index())
+
+    store = EventStore(events_path)
+    assert len(store.index["blocks"]) == 10
+    assert store.index["postings"]["track_id"]["2"] == list(range(10))
+    assert [d["frame"] for d in store.track(2)] == list(range(10))
+
+    enemy = list(store.query(t_start=1.0, t_end=2.0, side="enemy"))
+    assert [(d["track_id"], d["frame"]) for d in enemy] == [(1, 2), (1, 3)]
+
+    spawns = list(store.query(event="spawn"))
+    assert [d["frame"] for d in spawns] == [0]
+
+    ranged = list(store.query(frame_start=8, track_id=2))
+    assert [d["frame"] for d in ranged] == [8, 9]
+
+    # a rewrite that crashed before its index was written must not reuse the old one
+    with events_path.open("w", encoding="utf-8", newline="\n") as handle:
+        IndexedEventWriter(handle).write(
+            [Event(event="spawn", frame=0, t=0.0, track_id=7, bbox=(0, 0, 1, 1))]
+        )
+    with pytest.raises(ValueError):
+        EventStore(events_path).index
@@ -0,0 +1,195 @@
+import json
+import socket
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from rtb_perception.sinks import AsyncEventSink, StreamTransport, Transport, open_sink
+from rtb_perception.tracker import Event
+
+
+def _events(frame, count=2):
+    return [
+        Event(event="update", frame=frame, t=None, track_id=i, bbox=(0, 0, 10, 10))
+        for i in range(count)
+    ]
+
+
+def _serve(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_tcp_sink_delivers_batches():
+    received = []
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                received.append(json.loads(line))
+
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    _serve(server)
+    port = server.server_address[1]
+
+    sink = open_sink(f"tcp://127.0.0.1:{port}", batch_interval=0.01)
+    for frame in range(5):
+        assert sink.publish(_events(frame))
+    sink.close()
+    deadline = time.monotonic() + 2.0
+    while len(received) < 10 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    server.shutdown()
+    server.server_close()
+
+    assert sink.sent == 10
+    assert [r["frame"] for r in received] == [f for f in range(5) for _ in range(2)]
+
+
+def test_http_sink_posts_json_arrays():
+    bodies = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            length = int(self.headers["Content-Length"])
+            bodies.append(json.loads(self.rfile.read(length)))
+            self.send_response(204)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    _serve(server)
+    port = server.server_address[1]
+
+    with open_sink(f"http://127.0.0.1:{port}/events") as sink:
+        sink.publish(_events(0))
+        sink.publish(_events(1, count=1))
+    server.shutdown()
+    server.server_close()
+
+    assert sink.sent == 3
+    assert sum(len(body) for body in bodies) == 3
+    assert bodies[0][0]["frame"] == 0
+
+
+def test_unreachable_sink_drops_without_blocking():
+    probe = socket.socket()
+    probe.bind(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+
+    sink = AsyncEventSink(
+        StreamTransport(host="127.0.0.1", port=port),
+        queue_size=2,
+        policy="drop_oldest",
+        reconnect_initial=0.5,
+    ).start()
+    start = time.monotonic()
+    for frame in range(20):
+        sink.publish(_events(frame))
+    assert time.monotonic() - start < 0.5
+    sink.close(timeout=0.2)
+
+    assert sink.sent == 0
+    assert sink.dropped >= 34
+
+
+def test_http_sink_drops_rejected_batches_without_retry():
+    posts = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            length = int(self.headers["Content-Length"])
+            posts.append(json.loads(self.rfile.read(length)))
+            self.send_response(400 if len(posts) == 1 else 200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    _serve(server)
+    port = server.server_address[1]
+
+    with open_sink(f"http://127.0.0.1:{port}/events", policy="block") as sink:
+        assert sink.publish(_events(0))
+        time.sleep(0.1)
+        assert sink.publish(_events(1, count=1))
+    server.shutdown()
+    server.server_close()
+
+    assert len(posts) == 2
+    assert sink.dropped == 2
+    assert sink.sent == 1
+
+
+def test_http_sink_reads_chunked_responses():
+    posts = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            length = int(self.headers["Content-Length"])
+            posts.append(json.loads(self.rfile.read(length)))
+            self.send_response(200)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            self.wfile.write(b"2\r\nok\r\n0\r\n\r\n")
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    _serve(server)
+    port = server.server_address[1]
+
+    with open_sink(f"http://127.0.0.1:{port}/events", policy="block") as sink:
+        for frame in range(3):
+            assert sink.publish(_events(frame))
+            time.sleep(0.05)
+    server.shutdown()
+    server.server_close()
+
+    assert len(posts) == 3
+    assert sink.sent == 6
+    assert sink.dropped == 0
+
+
+def test_sink_worker_survives_unexpected_errors():
+    class FlakyTransport(Transport):
+        def __init__(self):
+            self.batches = []
+
+        async def connect(self):
+            pass
+
+        async def send(self, records):
+            if not self.batches:
+                self.batches.append(None)
+                raise IndexError("bad response")
+            self.batches.append(records)
+
+        async def close(self):
+            pass
+
+    transport = FlakyTransport()
+    with AsyncEventSink(transport, policy="block").start() as sink:
+        assert sink.publish(_events(0))
+        time.sleep(0.05)
+        assert sink.publish(_events(1))
+    assert sink.dropped == 2
+    assert sink.sent == 2
+    assert not sink.publish(_events(2))
+    assert sink.dropped == 4
@@ -25,3 +25,43 @@ def test_disappear_after_max_missed():
 
     events = tracker.update(2, [])
     assert [e.event for e in events] == ["disappear"]
+
+
+def test_frame_class_policies():
+    tracker = UnitTracker(confirm_frames=1, max_missed=1)
+    tracker.update(0, [(0, 0, 10, 10)])
+
+    assert tracker.update(1, [], frame_class="flash") == []
+    assert tracker.get_tracks()[0].missed_frames == 0
+
+    events = tracker.update(2, [(50, 50, 60, 60)], frame_class="cut")
+    assert [e.event for e in events] == ["disappear"]
+    assert events[0].meta == {"reason": "reset"}
+    assert tracker.get_tracks() == []
+
+
+def test_caps_evict_stalest_track_and_limit_candidates():
+    tracker = UnitTracker(confirm_frames=1, max_tracks=2, max_detections=3)
+    tracker.update(0, [(0, 0, 10, 10), (20, 20, 30, 30)])
+    events = tracker.update(1, [(20, 20, 30, 30), (40, 40, 60, 60)])
+    assert [e.event for e in events] == ["update", "disappear", "spawn"]
+    assert events[1].track_id == 1
+    assert events[1].meta == {"reason": "evicted"}
+
+    tracker = UnitTracker(confirm_frames=1, max_tracks=2)
+    boxes = [(0, 0, 10, 10), (20, 20, 30, 30), (40, 40, 50, 50)]
+    events = tracker.update(0, boxes)
+    assert [e.event for e in events] == ["spawn", "spawn"]
+    assert [c.bbox for c in tracker.get_candidates()] == [boxes[2]]
+    events = tracker.update(1, boxes)
+    assert [e.event for e in events] == ["update", "update"]
+    assert len(tracker.get_candidates()) == 1
+    events = tracker.update(2, boxes[1:])
+    assert [e.event for e in events] == ["update", "disappear", "spawn"]
+    assert events[1].track_id == 1
+    assert events[2].bbox == boxes[2]
+
+    tracker = UnitTracker(confirm_frames=3, max_candidates=2, max_detections=3)
+    tracker.update(0, [(i * 20, 0, i * 20 + 10 + i, 10) for i in range(5)])
+    assert len(tracker.get_candidates()) == 2
+    assert {c.bbox[0] for c in tracker.get_candidates()} == {60, 80}
@@ -0,0 +1,53 @@
+import numpy as np
+
+from rtb_perception.trajectory import (
+    TrajectoryBuffer,
+    decode_trajectory,
+    encode_trajectory,
+    simplify_trajectory,
+)
+from rtb_perception.tracker import UnitTracker
+
+
+def test_encode_decode_roundtrip_lossless():
+    buffer = TrajectoryBuffer()
+    points = [(3, (0, 0, 10, 10)), (4, (2, 1, 12, 11)), (6, (5, 3, 15, 13))]
+    for frame, bbox in points:
+        buffer.append(frame, bbox)
+    data = encode_trajectory(buffer)
+    assert data["observed"] == 3
+    assert decode_trajectory(data) == points
+
+
+def test_simplify_keeps_error_bound():
+    frames = np.arange(20)
+    boxes = np.stack([frames * 2, frames, frames * 2 + 10, frames + 10], axis=1)
+    boxes[10] += 5
+    keep = simplify_trajectory(frames, boxes, epsilon=1.0)
+    assert keep[0] == 0 and keep[-1] == 19
+    assert 10 in keep
+    assert len(keep) < 8
+
+
+def test_tracker_trajectory_mode_emits_one_record():
+    tracker = UnitTracker(
+        confirm_frames=1, max_missed=1, output_mode="trajectory", traj_epsilon=0.0
+    )
+    events = tracker.update(0, [(0, 0, 10, 10)])
+    assert [e.event for e in events] == ["spawn"]
+    events = tracker.update(1, [(1, 0, 11, 10)])
+    assert events == []
+    tracker.update(2, [])
+    events = tracker.update(3, [])
+    assert [e.event for e in events] == ["disappear", "trajectory"]
+    assert decode_trajectory(events[1].meta) == [(0, (0, 0, 10, 10)), (1, (1, 0, 11, 10))]
+
+
+def test_tracker_finish_flushes_active_tracks():
+    tracker = UnitTracker(confirm_frames=1, output_mode="trajectory")
+    tracker.update(0, [(0, 0, 10, 10)])
+    events = tracker.finish(0)
+    assert [e.event for e in events] == ["trajectory"]
+    assert tracker.finish(0) == []
+    assert tracker.get_tracks() == []
+    assert UnitTracker(confirm_frames=1).finish(0) == []